@@ -0,0 +1,159 @@
+import numpy as np
+import pybase64
+from config import TTS_STREAM_CHUNK_MS
+
+PCM16_SCALE = np.float32(1.0 / 32768.0)  # Int16 → [-1, 1) float32 (multiply, never divide)
+
+
+def float_to_pcm16(audio: np.ndarray, out: np.ndarray | None = None) -> np.ndarray:
+    """Convert float PCM in [-1, 1] to int16, clipping out-of-range samples.
+
+    Scales into one float32 scratch array, clips it in place and casts into out
+    (allocated if None) — a single temporary instead of one per clip/scale/cast step.
+    """
+    scaled = np.multiply(audio, 32767.0, dtype=np.float32)
+    np.clip(scaled, -32768.0, 32767.0, out=scaled)
+    if out is None:
+        return scaled.astype(np.int16)
+    np.copyto(out, scaled, casting="unsafe")
+    return out
+
+
+def pcm16_b64(pcm: np.ndarray) -> str:
+    """Base64-encode a contiguous int16 array straight from its buffer (no .tobytes() copy)."""
+    return pybase64.b64encode_as_string(memoryview(pcm).cast("B"))
+
+
+def pcm16_b64_chunks(pcm: np.ndarray, sample_rate: int) -> list[str]:
+    """Split int16 PCM into TTS_STREAM_CHUNK_MS pieces, each base64-encoded.
+
+    Lets the client schedule playback as soon as the first short chunk is decoded
+    instead of decoding one multi-second blob first.
+    """
+    chunk_samples = max(TTS_STREAM_CHUNK_MS * sample_rate // 1000, 1)
+    return [pcm16_b64(pcm[i : i + chunk_samples]) for i in range(0, len(pcm), chunk_samples)]
+
+
+class AudioRing:
+    """Preallocated float32 sample buffer with a write head.
+
+    Replaces per-chunk np.concatenate (O(N²) copying over an utterance) with an
+    in-place write; grows by doubling if an utterance outlives the initial capacity.
+    """
+
+    def __init__(self, capacity: int):
+        self.buf = np.empty(capacity, dtype=np.float32)
+        self.head = 0
+
+    def __len__(self) -> int:
+        return self.head
+
+    def _grow_to(self, end: int):
+        if end > len(self.buf):
+            grown = np.empty(max(end, 2 * len(self.buf)), dtype=np.float32)
+            grown[:self.head] = self.buf[:self.head]
+            self.buf = grown
+
+    def append(self, chunk: np.ndarray) -> np.ndarray:
+        """Copy chunk in; returns a view of the appended samples."""
+        start, end = self.head, self.head + len(chunk)
+        self._grow_to(end)
+        self.buf[start:end] = chunk
+        self.head = end
+        return self.buf[start:end]
+
+    def append_pcm16(self, raw: bytes) -> np.ndarray:
+        """Append raw PCM Int16 bytes, scaling straight into the buffer (no float32 temporary).
+
+        Returns a view of the appended samples.
+        """
+        int16_array = np.frombuffer(raw, dtype=np.int16)
+        start, end = self.head, self.head + len(int16_array)
+        self._grow_to(end)
+        np.multiply(int16_array, PCM16_SCALE, out=self.buf[start:end])
+        self.head = end
+        return self.buf[start:end]
+
+    def view(self) -> np.ndarray:
+        """Contiguous view of the buffered samples (valid until the next append/reset/consume)."""
+        return self.buf[:self.head]
+
+    def tail(self, n: int) -> np.ndarray:
+        """Contiguous view of the last n buffered samples (fewer if not that many yet)."""
+        return self.buf[max(0, self.head - n):self.head]
+
+    def reset(self):
+        self.head = 0
+
+    def consume(self, n: int):
+        """Drop the first n samples, shifting the remainder to the front."""
+        remaining = self.head - n
+        self.buf[:remaining] = self.buf[n:self.head]
+        self.head = remaining
+
+
+class FrameRing:
+    """Fixed-size circular float32 buffer for frame-by-frame streaming (PersonaPlex).
+
+    Appends write at head modulo capacity (split in two when they wrap) and frames are
+    read from tail, so a long session never shifts or reallocates the residual samples.
+    """
+
+    def __init__(self, capacity: int, frame_size: int):
+        self.buf = np.empty(capacity, dtype=np.float32)
+        self.frame_size = frame_size
+        self.wrap_frame = np.empty(frame_size, dtype=np.float32)  # staging for frames that wrap
+        self.head = 0  # next write position
+        self.tail = 0  # next read position
+        self.size = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    def _reserve(self, n: int):
+        # Only hit if the client outpaces the model by more than the capacity — linearize and double
+        if self.size + n > len(self.buf):
+            grown = np.empty(max(self.size + n, 2 * len(self.buf)), dtype=np.float32)
+            self._read_into(grown[:self.size])
+            self.buf, self.head, self.tail = grown, self.size, 0
+
+    def _read_into(self, out: np.ndarray):
+        first = min(len(out), len(self.buf) - self.tail)
+        out[:first] = self.buf[self.tail:self.tail + first]
+        out[first:] = self.buf[:len(out) - first]
+
+    def append(self, chunk: np.ndarray):
+        n = len(chunk)
+        self._reserve(n)
+        first = min(n, len(self.buf) - self.head)
+        self.buf[self.head:self.head + first] = chunk[:first]
+        self.buf[:n - first] = chunk[first:]
+        self.head = (self.head + n) % len(self.buf)
+        self.size += n
+
+    def append_pcm16(self, raw: bytes):
+        """Append raw PCM Int16 bytes, scaling straight into the ring (no float32 temporary)."""
+        int16_array = np.frombuffer(raw, dtype=np.int16)
+        n = len(int16_array)
+        self._reserve(n)
+        first = min(n, len(self.buf) - self.head)
+        np.multiply(int16_array[:first], PCM16_SCALE, out=self.buf[self.head:self.head + first])
+        np.multiply(int16_array[first:], PCM16_SCALE, out=self.buf[:n - first])
+        self.head = (self.head + n) % len(self.buf)
+        self.size += n
+
+    def pop_frame(self) -> np.ndarray:
+        """Remove and return the oldest frame_size samples.
+
+        A view into the ring unless the frame wraps, in which case it is copied into a
+        reused staging buffer; either way valid only until the next append/pop_frame.
+        """
+        end = self.tail + self.frame_size
+        if end <= len(self.buf):
+            frame = self.buf[self.tail:end]
+        else:
+            frame = self.wrap_frame
+            self._read_into(frame)
+        self.tail = end % len(self.buf)
+        self.size -= self.frame_size
+        return frame
@@ -1,6 +1,9 @@
+import functools
+import logging
 import os
 import platform
-import torch
+
+logger = logging.getLogger(__name__)
 
 # Model names (override via environment variables)
 OMNI_MODEL_NAME = os.environ.get("OMNI_MODEL_NAME", "Qwen/Qwen3-Omni-30B-A3B-Instruct")
@@ -9,31 +12,237 @@ TRANSLATION_MODEL_NAME = os.environ.get("TRANSLATION_MODEL_NAME", "Qwen/Qwen3-4B
 TTS_MODEL_NAME = os.environ.get("TTS_MODEL_NAME", "Qwen/Qwen3-TTS-12Hz-0.6B-CustomVoice")
 PERSONAPLEX_MODEL_NAME = os.environ.get("PERSONAPLEX_MODEL_NAME", "nvidia/personaplex-7b-v1")
 PERSONAPLEX_VOICE = os.environ.get("PERSONAPLEX_VOICE", "NATM1")
+# Overlap PersonaPlex encode / LM step / decode across frames on separate CUDA streams.
+# Opt-in: output audio trails the input by one extra 80ms frame.
+PERSONAPLEX_CUDA_STREAMS = os.environ.get("PERSONAPLEX_CUDA_STREAMS", "0") == "1"
+
+# Optional small LM (same tokenizer as TRANSLATION_MODEL_NAME, e.g. "Qwen/Qwen3-0.6B") used as the
+# assistant model for speculative decoding in the translation pipeline. Empty = disabled.
+SPECULATIVE_DRAFT_MODEL = os.environ.get("SPECULATIVE_DRAFT_MODEL", "")
+
+# torch.compile mode for the translation LM forward ("" = disabled, e.g. "reduce-overhead").
+# Opt-in: every new prompt length recompiles the prefill graph, so only worth it for long sessions.
+TORCH_COMPILE_MODE = os.environ.get("TORCH_COMPILE_MODE", "")
+# Same for the PersonaPlex per-frame LMGen step and Mimi encode/decode — fixed frame shapes, so
+# "reduce-overhead" captures each as a CUDA graph; compiled and warmed up in load()
+PERSONAPLEX_COMPILE_MODE = os.environ.get("PERSONAPLEX_COMPILE_MODE", "")
+# Persist Inductor's compiled kernels outside /tmp so restarts reuse them instead of recompiling
+os.environ.setdefault("TORCHINDUCTOR_CACHE_DIR", os.path.expanduser("~/.cache/torchinductor"))
+
+# Translation LM token budgets: prompts (system + context turns + text) are capped at
+# MAX_CONTEXT_TOKENS by dropping the oldest context turns, outputs at MAX_NEW_TOKENS
+MAX_CONTEXT_TOKENS = int(os.environ.get("MAX_CONTEXT_TOKENS", "4096"))
+MAX_NEW_TOKENS = int(os.environ.get("MAX_NEW_TOKENS", "512"))
+
+# Shared greedy decoding settings for text generate() calls
+GENERATION_KWARGS = {"use_cache": True, "do_sample": False, "num_beams": 1}
 
-# Device settings — auto-detect Mac vs CUDA
+# Device settings — auto-detect Mac vs CUDA (torch-dependent values resolve lazily, see _device_settings)
 IS_MAC = platform.system() == "Darwin"
-if os.environ.get("DEVICE_MAP"):
-    DEVICE_MAP = os.environ["DEVICE_MAP"]
-elif torch.cuda.is_available() or (IS_MAC and torch.backends.mps.is_available()):
-    DEVICE_MAP = "auto"  # "auto" works for both CUDA and MPS in transformers 4.57+
-else:
-    DEVICE_MAP = "cpu"
 
-# Mac doesn't support flash_attention_2; use float16 (well-supported on MPS)
-TORCH_DTYPE = "float16" if IS_MAC else "bfloat16"
-ATTN_IMPLEMENTATION = "eager" if IS_MAC else "flash_attention_2"
+# Materialize checkpoint shards straight onto their target device (accelerate's
+# meta-device init) instead of building the full model in CPU RAM first
+LOW_CPU_MEM_USAGE = os.environ.get("LOW_CPU_MEM_USAGE", "1") == "1"
+
+CACHE_IMPLEMENTATION = os.environ.get("CACHE_IMPLEMENTATION", "static")  # KV cache for the compiled translator
+NON_BLOCKING_TRANSFER = True  # async host→device audio uploads (paired with PIN_MEMORY)
+
+
+def _has_fa2() -> bool:
+    """flash_attention_2 needs the flash_attn package and an Ampere+ (SM80) GPU."""
+    import torch
+
+    try:
+        import flash_attn  # noqa: F401
+    except ImportError:
+        return False
+    return torch.cuda.is_available() and torch.cuda.get_device_capability()[0] >= 8
+
+
+@functools.cache
+def _device_settings() -> dict:
+    """Resolve every torch-dependent setting on first access.
+
+    `import torch` costs 1-2s cold, so processes that only need the plain constants
+    above (HOST, PORT, model names) never pay it. Exposed as module attributes
+    through __getattr__ below, so `from config import TORCH_DTYPE` keeps working.
+    """
+    import torch
+    from torch.nn.attention import SDPBackend
+
+    # Device settings — auto-detect Mac vs CUDA
+    if os.environ.get("DEVICE_MAP"):
+        device_map = os.environ["DEVICE_MAP"]
+    elif torch.cuda.is_available() or (IS_MAC and torch.backends.mps.is_available()):
+        device_map = "auto"  # "auto" works for both CUDA and MPS in transformers 4.57+
+    else:
+        device_map = "cpu"
+
+    # Mac doesn't support flash_attention_2; use float16 (well-supported on MPS) and SDPA,
+    # which has a fused MPS kernel. Elsewhere prefer FA2 when available, otherwise SDPA
+    # (which dispatches to the flash / memory-efficient kernels itself).
+    # ATTN_IMPLEMENTATION=eager restores the old unfused path if a model misbehaves.
+    dtype_str = os.environ.get("TORCH_DTYPE", "float16" if IS_MAC else "bfloat16")
+    torch_dtype = getattr(torch, dtype_str, None)
+    if not isinstance(torch_dtype, torch.dtype):
+        raise ValueError(f"Unknown TORCH_DTYPE: {dtype_str!r}")
+    if torch_dtype == torch.bfloat16 and torch.cuda.is_available() and torch.cuda.get_device_capability()[0] < 8:
+        logger.warning("bfloat16 needs an SM80+ GPU — using float16 instead")
+        torch_dtype = torch.float16
+
+    return {
+        "DEVICE_MAP": device_map,
+        # Per-model placement, so complementary models can live on different GPUs
+        # (e.g. ASR_DEVICE=cuda:0 TRANSLATION_DEVICE=cuda:1). Defaults keep everything on DEVICE_MAP.
+        "DEVICE_MAPS": {
+            "omni": os.environ.get("OMNI_DEVICE", device_map),
+            "asr": os.environ.get("ASR_DEVICE"),  # None = qwen_asr's own default placement
+            "translation": os.environ.get("TRANSLATION_DEVICE", device_map),
+            # Mac forces CPU — MPS doesn't support >65536 output channels needed by TTS
+            "tts": os.environ.get("TTS_DEVICE", "cpu" if IS_MAC else device_map),
+            "personaplex": os.environ.get("PERSONAPLEX_DEVICE", "cuda" if torch.cuda.is_available() else "cpu"),
+        },
+        "TORCH_DTYPE": torch_dtype,
+        "ATTN_IMPLEMENTATION": os.environ.get("ATTN_IMPLEMENTATION") or (
+            "sdpa" if IS_MAC else ("flash_attention_2" if _has_fa2() else "sdpa")
+        ),
+        # Every generate() call here is batch-1 with a bounded output, so a static KV cache
+        # (CACHE_IMPLEMENTATION) gives the decode step fixed shapes that
+        # torch.compile(mode="reduce-overhead") can capture as CUDA graphs
+        "USE_CUDA_GRAPHS": torch.cuda.is_available() and not IS_MAC,
+        # Host→device audio uploads: stage in pinned memory so .to(device, non_blocking=True) is truly async
+        "PIN_MEMORY": torch.cuda.is_available() and not IS_MAC,
+        # SDPA backends allowed around generate() when ATTN_IMPLEMENTATION == "sdpa" (no math fallback)
+        "SDPA_KERNELS": [SDPBackend.FLASH_ATTENTION, SDPBackend.EFFICIENT_ATTENTION],
+    }
+
+
+_DEVICE_SETTING_NAMES = frozenset({
+    "DEVICE_MAP", "DEVICE_MAPS", "TORCH_DTYPE", "ATTN_IMPLEMENTATION",
+    "USE_CUDA_GRAPHS", "PIN_MEMORY", "SDPA_KERNELS",
+})
+
+
+def __getattr__(name: str):
+    # PEP 562 — only called for names not found as regular module globals
+    if name in _DEVICE_SETTING_NAMES:
+        return _device_settings()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# Weight quantization for the large LMs (Omni, Translation):
+# "none" | "int8" | "int8wo" | "int4" (alias "nf4") | "fp8"
+QUANTIZATION = os.environ.get("QUANTIZATION", "none").lower()
+# PersonaPlex LM (temporal transformer only — Mimi and the Depformer stay bf16): "none" | "int8" | "int4"
+PERSONAPLEX_QUANTIZATION = os.environ.get("PERSONAPLEX_QUANTIZATION", "none").lower()
+
+
+def _require_quant_backend(package: str, mode: str):
+    """Fail with an install hint instead of a bare ImportError deep inside from_pretrained()."""
+    import importlib.util
+
+    if importlib.util.find_spec(package) is None:
+        raise ImportError(
+            f"QUANTIZATION={mode} needs the {package} package. Install with: pip install -r requirements.txt"
+        )
+
+
+def build_quant_config():
+    """Build the `quantization_config` for from_pretrained() from QUANTIZATION.
+
+    Returns None when quantization is disabled. int8/int4 use bitsandbytes
+    (int4 = NF4 with bf16 compute); int8wo is torchao int8 weight-only (bf16
+    activations, dequantized inside the matmul); fp8 uses torchao and needs an
+    SM89+ GPU, otherwise it falls back to int8.
+    """
+    mode = "int4" if QUANTIZATION == "nf4" else QUANTIZATION
+    if mode == "none":
+        return None
+
+    import torch
+
+    if mode == "int8wo":
+        _require_quant_backend("torchao", mode)
+        from transformers import TorchAoConfig
+        from torchao.quantization import Int8WeightOnlyConfig
+
+        return TorchAoConfig(quant_type=Int8WeightOnlyConfig())
+
+    if mode == "fp8":
+        if torch.cuda.is_available() and torch.cuda.get_device_capability() >= (8, 9):
+            _require_quant_backend("torchao", mode)
+            from transformers import TorchAoConfig
+            from torchao.quantization import Float8DynamicActivationFloat8WeightConfig
+
+            return TorchAoConfig(quant_type=Float8DynamicActivationFloat8WeightConfig())
+        logger.warning("QUANTIZATION=fp8 needs an SM89+ GPU — falling back to int8")
+        mode = "int8"
+
+    from transformers import BitsAndBytesConfig
+
+    if mode == "int8":
+        _require_quant_backend("bitsandbytes", mode)
+        return BitsAndBytesConfig(load_in_8bit=True)
+    if mode == "int4":
+        _require_quant_backend("bitsandbytes", mode)
+        return BitsAndBytesConfig(
+            load_in_4bit=True,
+            bnb_4bit_quant_type="nf4",
+            bnb_4bit_compute_dtype=_device_settings()["TORCH_DTYPE"],
+        )
+    raise ValueError(f"Unknown QUANTIZATION: {QUANTIZATION!r} (expected none, int8, int8wo, int4, nf4 or fp8)")
+
 
 # Audio parameters
 INPUT_SAMPLE_RATE = 16000
 OUTPUT_SAMPLE_RATE = 24000
-AUDIO_CHUNK_SIZE = 4096
+TTS_STREAM_CHUNK_MS = int(os.environ.get("TTS_STREAM_CHUNK_MS", "240"))  # TTS audio is sent to the client in chunks this long
+TTS_CPU_INT8 = os.environ.get("TTS_CPU_INT8", "0") == "1"  # dynamic int8 Linear layers when TTS runs on CPU (e.g. Mac)
+# Samples per client audio message at INPUT_SAMPLE_RATE — sent to the client on connect, which
+# captures with a ScriptProcessor of this size; each chunk costs BUFFER_LATENCY_MS before the server sees it.
+# ScriptProcessor sizes (powers of two, 256-16384) are all whole Silero VAD windows (256 or n*512)
+AUDIO_CHUNK_SIZES = (256, 512, 1024, 2048, 4096, 8192, 16384)
+AUDIO_CHUNK_SIZE = int(os.environ.get("AUDIO_CHUNK_SIZE", "4096"))
+if AUDIO_CHUNK_SIZE not in AUDIO_CHUNK_SIZES:
+    logger.warning(f"AUDIO_CHUNK_SIZE={AUDIO_CHUNK_SIZE} is not one of {AUDIO_CHUNK_SIZES} — using 4096")
+    AUDIO_CHUNK_SIZE = 4096
+BUFFER_LATENCY_MS = 1000 * AUDIO_CHUNK_SIZE / INPUT_SAMPLE_RATE
 
 # VAD settings
 VAD_THRESHOLD = 0.3  # Lower = stricter (more confidence needed to count as "speech")
 VAD_SILENCE_DURATION_MS = 1000  # ms of silence before triggering inference
 MIN_SPEECH_DURATION_S = 1.0  # Minimum seconds of audio before processing (skip short noise)
+MIN_SPEECH_SAMPLES = int(MIN_SPEECH_DURATION_S * INPUT_SAMPLE_RATE)  # same, as an integer sample count
+VAD_EARLY_EXIT_THRESHOLD = float(os.environ.get("VAD_EARLY_EXIT_THRESHOLD", "0.15"))  # below: drop chunk unbuffered
+# Fast path: once an utterance has peaked above VAD_HIGH_CONFIDENCE_THRESHOLD it is clearly speech,
+# so its end only needs VAD_FAST_SILENCE_DURATION_MS of silence instead of VAD_SILENCE_DURATION_MS
+VAD_HIGH_CONFIDENCE_THRESHOLD = float(os.environ.get("VAD_HIGH_CONFIDENCE_THRESHOLD", "0.6"))
+VAD_FAST_SILENCE_DURATION_MS = int(os.environ.get("VAD_FAST_SILENCE_DURATION_MS", "500"))
+# Opt-in: drop utterances whose VAD probability never reached VAD_THRESHOLD instead of running ASR/Omni
+VAD_DROP_LOW_CONFIDENCE = os.environ.get("VAD_DROP_LOW_CONFIDENCE", "0") == "1"
+# RMS short-circuit for the speech-end check: a tail quieter than the silence floor counts as
+# silence, louder than the speech floor as speech; only the band in between runs the neural VAD.
+# The speech side is opt-in (e.g. VAD_RMS_SPEECH_FLOOR=0.05 for quiet rooms) — background noise
+# above the floor would otherwise keep an utterance from ever ending; 1.0 = off
+VAD_RMS_SILENCE_FLOOR = float(os.environ.get("VAD_RMS_SILENCE_FLOOR", "0.003"))
+VAD_RMS_SPEECH_FLOOR = float(os.environ.get("VAD_RMS_SPEECH_FLOOR", "1.0"))
+# Per-window peak below which a speech-end tail window is silence without running the VAD model
+VAD_SILENCE_AMP_THRESHOLD = float(os.environ.get("VAD_SILENCE_AMP_THRESHOLD", "0.01"))
+# Peak-normalize the speech-end tail before scoring it (for very quiet mics); off = raw PCM
+VAD_NORMALIZE = os.environ.get("VAD_NORMALIZE", "0") == "1"
+# "onnx" (silero on onnxruntime, CPU), "jit" (silero TorchScript) or "ten" (TEN VAD, 16kHz only —
+# pip install git+https://github.com/TEN-framework/ten-vad.git; falls back to silero if missing)
+VAD_BACKEND = os.environ.get("VAD_BACKEND", "onnx")
+VAD_NUM_THREADS = int(os.environ.get("VAD_NUM_THREADS", "1"))  # intra-op threads for the ONNX session
 
 # Server settings
 HOST = os.environ.get("HOST", "0.0.0.0")
 PORT = int(os.environ.get("PORT", "8000"))
-CORS_ORIGINS = os.environ.get("CORS_ORIGINS", "http://localhost:3000").split(",")
+UVICORN_LOOP = os.environ.get("UVICORN_LOOP", "uvloop")  # C event loop (uvicorn[standard])
+UVICORN_HTTP = os.environ.get("UVICORN_HTTP", "httptools")  # C HTTP parser
+UVICORN_WS = os.environ.get("UVICORN_WS", "websockets")
+UVICORN_WORKERS = int(os.environ.get("UVICORN_WORKERS", "1"))  # keep 1 — models live in-process
+UVICORN_RELOAD = os.environ.get("UVICORN_RELOAD", "0") == "1"  # dev only — the file watcher competes with audio threads
+CORS_ORIGINS = tuple(
+    o.strip() for o in os.environ.get("CORS_ORIGINS", "http://localhost:3000").split(",") if o.strip()
+)
@@ -1,49 +1,91 @@
 import asyncio
-import base64
-import json
 import logging
 import re
 import struct
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 import numpy as np
+import orjson
+import pybase64
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 
-from config import CORS_ORIGINS, HOST, PORT, INPUT_SAMPLE_RATE, OUTPUT_SAMPLE_RATE, IS_MAC, MIN_SPEECH_DURATION_S, PERSONAPLEX_MODEL_NAME
-from models.omni import omni_model
-from models.pipeline import asr_model, translation_model, tts_model, vad_detector
-from models.personaplex import personaplex_model
+from audio import PCM16_SCALE, AudioRing, FrameRing
+from transcripts import splice_transcripts
+from config import (
+    CORS_ORIGINS, HOST, PORT, UVICORN_LOOP, UVICORN_HTTP, UVICORN_WS, UVICORN_WORKERS, UVICORN_RELOAD,
+    INPUT_SAMPLE_RATE, OUTPUT_SAMPLE_RATE, AUDIO_CHUNK_SIZE, BUFFER_LATENCY_MS, IS_MAC, MIN_SPEECH_SAMPLES, PERSONAPLEX_MODEL_NAME,
+    VAD_THRESHOLD, VAD_EARLY_EXIT_THRESHOLD, VAD_HIGH_CONFIDENCE_THRESHOLD, VAD_DROP_LOW_CONFIDENCE,
+    VAD_SILENCE_DURATION_MS, VAD_FAST_SILENCE_DURATION_MS, VAD_RMS_SILENCE_FLOOR, VAD_RMS_SPEECH_FLOOR,
+)
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Sample-count thresholds, precomputed so the receive loops compare ints
+VAD_MIN_SAMPLES = INPUT_SAMPLE_RATE // 2  # buffered audio before the speech-end VAD runs
+OMNI_MIN_SAMPLES = int(INPUT_SAMPLE_RATE * 0.3)  # shortest utterance sent to Omni
+
+SENT_END_RE = re.compile(r'[.!?]$')  # text ends a sentence
+SENT_BOUND_RE = re.compile(r'[.!?,;:]')  # text contains a sentence/clause boundary
+
+FILLER_WORDS = frozenset({'the', 'okay', 'um', 'uh', 'ah', 'oh', 'hmm', 'hm', 'a', 'an'})
+MAX_FILLER_CHARS = 32  # longer text is never treated as pure filler
+
+
+def is_filler(text: str) -> bool:
+    cleaned = text.strip().rstrip('.')
+    if len(cleaned) > MAX_FILLER_CHARS:
+        return False
+    for w in cleaned.split():
+        if w.lower() not in FILLER_WORDS:
+            return False
+    return True
+
+# Bounded executors instead of the shared default pool (min(32, cpu+4) threads):
+# model inference is GPU-serialized anyway, so a couple of threads avoids contention;
+# CPU-side VAD gets its own pool so it never queues behind a long ASR/TTS call — a single
+# thread, since every session shares one stateful VAD (load_vad) and each call resets its state
+MODEL_EXECUTOR = ThreadPoolExecutor(max_workers=2, thread_name_prefix="model")
+AUDIO_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix="audio")
+# Waits on token streamers (generation runs in its own thread) — mostly idle, so never hold a model thread
+STREAM_EXECUTOR = ThreadPoolExecutor(max_workers=8, thread_name_prefix="stream")
+
+
+# Loaded model singletons by name — filled by the load_* functions, which import the model
+# modules lazily (torch/transformers/moshi cost seconds), so health/unload never import them
+MODELS: dict = {}
+
+
+def is_loaded(name: str) -> bool:
+    model = MODELS.get(name)
+    return model is not None and model.loaded
+
 
 def unload_all_models():
     """Unload all models to free GPU memory."""
-    if omni_model.loaded:
-        omni_model.unload()
-    if asr_model.loaded:
-        asr_model.unload()
-    if translation_model.loaded:
-        translation_model.unload()
-    if tts_model.loaded:
-        tts_model.unload()
-    if vad_detector.loaded:
-        vad_detector.unload()
-    if personaplex_model.loaded:
-        personaplex_model.unload()
+    for model in MODELS.values():
+        if model.loaded:
+            model.unload()
 
 
 def load_omni():
     """Unload everything else, then load Omni."""
+    from models.omni import omni_model
+
     unload_all_models()
+    MODELS["omni"] = omni_model
     omni_model.load()
 
 
 def load_pipeline():
     """Unload everything else, then load Pipeline models."""
+    from models.pipeline import asr_model, translation_model, tts_model, vad_detector
+
     unload_all_models()
+    MODELS.update(asr=asr_model, translation=translation_model, tts=tts_model, vad=vad_detector)
     asr_model.load()
     translation_model.load()
     tts_model.load()
@@ -52,7 +94,10 @@ def load_pipeline():
 
 def load_personaplex():
     """Unload everything else, then load PersonaPlex."""
+    from models.personaplex import personaplex_model
+
     unload_all_models()
+    MODELS["personaplex"] = personaplex_model
     personaplex_model.load()
 
 
@@ -60,8 +105,12 @@ def load_personaplex():
 async def lifespan(app: FastAPI):
     """Lazy loading — no models loaded at startup. Each mode loads on demand."""
     logger.info("Server starting (lazy model loading — no models loaded at startup)")
+    logger.info(f"Audio chunk: {AUDIO_CHUNK_SIZE} samples ({BUFFER_LATENCY_MS:.0f}ms capture latency)")
     yield
     logger.info("Shutting down — unloading models")
+    MODEL_EXECUTOR.shutdown(wait=False, cancel_futures=True)
+    AUDIO_EXECUTOR.shutdown(wait=False, cancel_futures=True)
+    STREAM_EXECUTOR.shutdown(wait=False, cancel_futures=True)
     unload_all_models()
 
 
@@ -76,11 +125,88 @@ app.add_middleware(
 )
 
 
+def decode_pcm(raw: bytes) -> np.ndarray:
+    """Decode raw little-endian PCM Int16 bytes to float32 numpy array."""
+    int16_array = np.frombuffer(raw, dtype=np.int16)
+    # One fused pass: cast + scale straight into the float32 result (no intermediate copy).
+    # Fresh array each call — chunks are kept in the utterance buffers, so no shared scratch.
+    return np.multiply(int16_array, PCM16_SCALE, dtype=np.float32)
+
+
 def decode_pcm_base64(data: str) -> np.ndarray:
     """Decode base64 PCM Int16 data to float32 numpy array."""
-    raw = base64.b64decode(data)
-    int16_array = np.frombuffer(raw, dtype=np.int16)
-    return int16_array.astype(np.float32) / 32768.0
+    return decode_pcm(pybase64.b64decode(data, validate=False))  # SIMD decode (AVX2/NEON)
+
+
+async def receive_msg(websocket: WebSocket) -> dict:
+    """Receive one client message.
+
+    Binary frames are raw PCM Int16 audio (no base64 / JSON) and come back as
+    {"type": "audio", "pcm": bytes}; text frames are JSON control messages
+    (legacy {"type": "audio", "data": <base64>} is still accepted).
+    """
+    message = await websocket.receive()
+    if message["type"] == "websocket.disconnect":
+        raise WebSocketDisconnect(message.get("code", 1000))
+    if message.get("bytes") is not None:
+        return {"type": "audio", "pcm": message["bytes"]}
+    return orjson.loads(message["text"])
+
+
+async def websocket_reader(websocket: WebSocket, inbox: asyncio.Queue):
+    """Background task: push every client message onto inbox.
+
+    Ends by pushing the exception that stopped it (WebSocketDisconnect on a normal
+    close) so the consumer re-raises it in its own context.
+    """
+    try:
+        while True:
+            inbox.put_nowait(await receive_msg(websocket))
+    except Exception as e:
+        inbox.put_nowait(e)
+
+
+async def send(websocket: WebSocket, msg: dict):
+    """Send a JSON message serialized with orjson (much faster than stdlib json's send_json).
+
+    Sent as a text frame — the frontend hooks JSON.parse() event.data, which a binary frame would break.
+    """
+    await websocket.send_text(orjson.dumps(msg).decode())
+
+
+def speech_end_silence_ms(peak_speech_prob: float) -> int:
+    """Silence that ends an utterance — shorter once it has been high-confidence speech (fast path)."""
+    if peak_speech_prob >= VAD_HIGH_CONFIDENCE_THRESHOLD:
+        return VAD_FAST_SILENCE_DURATION_MS
+    return VAD_SILENCE_DURATION_MS
+
+
+def rms_speech_end(ring: AudioRing, silence_ms: int) -> bool | None:
+    """Energy pre-check for detect_speech_end over the last silence_ms, cheap enough for the event loop.
+
+    True = near-silent tail (speech ended), False = tail loud enough to be speech
+    (or too short to judge, as in detect_speech_end), None = ambiguous — run the VAD model.
+    """
+    tail_samples = int(silence_ms / 1000 * INPUT_SAMPLE_RATE)
+    if len(ring) < tail_samples:
+        return False
+    tail = ring.tail(tail_samples)
+    rms = float(np.sqrt(np.dot(tail, tail) / len(tail)))
+    if rms < VAD_RMS_SILENCE_FLOOR:
+        return True
+    if rms > VAD_RMS_SPEECH_FLOOR:
+        return False
+    return None
+
+
+def buffer_audio_msg(ring: AudioRing, msg: dict) -> np.ndarray:
+    """Append an audio message's samples to ring; returns a view of the new samples.
+
+    Binary frames are converted Int16 → float32 directly into the ring's storage.
+    """
+    if "pcm" in msg:
+        return ring.append_pcm16(msg["pcm"])
+    return ring.append(decode_pcm_base64(msg["data"]))
 
 
 @app.get("/health")
@@ -88,12 +214,8 @@ async def health():
     return {
         "status": "ok",
         "models": {
-            "omni": omni_model.loaded,
-            "asr": asr_model.loaded,
-            "translation": translation_model.loaded,
-            "tts": tts_model.loaded,
-            "vad": vad_detector.loaded,
-            "personaplex": personaplex_model.loaded,
+            name: is_loaded(name)
+            for name in ("omni", "asr", "translation", "tts", "vad", "personaplex")
         },
     }
 
@@ -103,53 +225,88 @@ async def ws_omni(websocket: WebSocket):
     """Qwen3-Omni bidirectional streaming endpoint."""
     await websocket.accept()
     logger.info("Omni WebSocket connected")
+    await send(websocket, {"type": "audio_config", "chunkSize": AUDIO_CHUNK_SIZE})
 
-    loop = asyncio.get_event_loop()
+    loop = asyncio.get_running_loop()
 
     # Lazy load: unload other models, load Omni
-    if not omni_model.loaded:
+    if not is_loaded("omni"):
         try:
             logger.info("Loading Omni model on demand...")
-            await websocket.send_json({"type": "status", "data": "loading_model"})
+            await send(websocket, {"type": "status", "data": "loading_model"})
             await loop.run_in_executor(None, load_omni)
         except Exception as e:
             logger.error(f"Failed to load Omni model: {e}")
-            await websocket.send_json({"type": "error", "message": f"Model load failed: {e}"})
+            await send(websocket, {"type": "error", "message": f"Model load failed: {e}"})
             await websocket.close()
             return
 
-    audio_buffer = np.array([], dtype=np.float32)
+    omni_model = MODELS["omni"]
+
+    # Max utterance before a forced flush, so noise that never reads as silence can't grow the ring forever
+    MAX_BUFFER_S = 15.0
+    MAX_BUFFER_SAMPLES = int(INPUT_SAMPLE_RATE * MAX_BUFFER_S)
+    audio_ring = AudioRing(INPUT_SAMPLE_RATE * 10)
     target_language = "French"
 
+    # Early-exit VAD gating: leading non-speech is never buffered; high-confidence
+    # utterances end after a shorter silence (VAD_DROP_LOW_CONFIDENCE drops non-speech ones)
+    speech_started = False
+    peak_speech_prob = 0.0
+
     try:
-        await websocket.send_json({"type": "status", "data": "ready"})
+        await send(websocket, {"type": "status", "data": "ready"})
 
         while True:
-            raw = await websocket.receive_text()
-            msg = json.loads(raw)
+            msg = await receive_msg(websocket)
+            msg_type = msg["type"]
 
-            if msg["type"] == "config":
-                target_language = msg.get("targetLanguage", "French")
-                logger.info(f"Omni config: target={target_language}")
+            if msg_type == "audio":
+                chunk = buffer_audio_msg(audio_ring, msg)  # view of the samples just buffered
 
-            elif msg["type"] == "audio":
-                chunk = decode_pcm_base64(msg["data"])
-                audio_buffer = np.concatenate([audio_buffer, chunk])
+                if omni_model.loaded and peak_speech_prob < VAD_HIGH_CONFIDENCE_THRESHOLD:
+                    try:
+                        chunk_prob = await loop.run_in_executor(
+                            AUDIO_EXECUTOR, omni_model.speech_prob, chunk, INPUT_SAMPLE_RATE
+                        )
+                    except Exception as e:
+                        logger.warning(f"[Omni] VAD speech_prob failed, keeping chunk as speech: {e}")
+                        chunk_prob = VAD_THRESHOLD
+                    if not speech_started and chunk_prob < VAD_EARLY_EXIT_THRESHOLD:
+                        # Keep only this chunk as pre-roll so the first word's onset isn't clipped
+                        audio_ring.consume(len(audio_ring) - len(chunk))
+                        continue
+                    speech_started = True
+                    peak_speech_prob = max(peak_speech_prob, chunk_prob)
 
                 # Check for speech end via VAD
-                if omni_model.loaded and len(audio_buffer) > INPUT_SAMPLE_RATE * 0.5:
-                    has_silence = await loop.run_in_executor(
-                        None, omni_model.detect_speech_end, audio_buffer, INPUT_SAMPLE_RATE
-                    )
+                if omni_model.loaded and len(audio_ring) > VAD_MIN_SAMPLES:
+                    silence_ms = speech_end_silence_ms(peak_speech_prob)
+                    has_silence = rms_speech_end(audio_ring, silence_ms)
+                    if has_silence is None:
+                        has_silence = await loop.run_in_executor(
+                            AUDIO_EXECUTOR, omni_model.detect_speech_end, audio_ring, INPUT_SAMPLE_RATE, silence_ms
+                        )
+
+                    too_long = len(audio_ring) > MAX_BUFFER_SAMPLES
+                    if too_long and not has_silence:
+                        logger.info(f"[Omni] Auto-flush: buffer exceeded {MAX_BUFFER_S}s")
+
+                    if has_silence and VAD_DROP_LOW_CONFIDENCE and peak_speech_prob < VAD_THRESHOLD:
+                        # Never scored as speech — drop it instead of running Omni on it
+                        audio_ring.reset()
+                        speech_started = False
+                        peak_speech_prob = 0.0
 
-                    if has_silence and len(audio_buffer) > INPUT_SAMPLE_RATE * 0.3:
-                        await websocket.send_json({"type": "status", "data": "processing"})
+                    elif (has_silence or too_long) and len(audio_ring) > OMNI_MIN_SAMPLES:
+                        await send(websocket, {"type": "status", "data": "processing"})
 
-                        # Run inference in thread pool
+                        # Run inference in thread pool. Passes a view, not a copy: this handler is
+                        # parked on the await, so nothing appends to / resets the ring meanwhile
                         result = await loop.run_in_executor(
-                            None,
+                            MODEL_EXECUTOR,
                             omni_model.translate,
-                            audio_buffer.copy(),
+                            audio_ring.view(),
                             INPUT_SAMPLE_RATE,
                             target_language,
                         )
@@ -157,23 +314,29 @@ async def ws_omni(websocket: WebSocket):
                         # Send source text (we don't have separate ASR in omni mode,
                         # but the model may provide input transcription)
                         if result.get("text"):
-                            await websocket.send_json({
+                            await send(websocket, {
                                 "type": "translated_text",
                                 "data": result["text"],
                             })
 
                         if result.get("audio"):
-                            await websocket.send_json({
+                            await send(websocket, {
                                 "type": "audio",
                                 "data": result["audio"],
                                 "sampleRate": OUTPUT_SAMPLE_RATE,
                             })
 
                         # Clear buffer after processing
-                        audio_buffer = np.array([], dtype=np.float32)
-                        await websocket.send_json({"type": "status", "data": "ready"})
+                        audio_ring.reset()
+                        speech_started = False
+                        peak_speech_prob = 0.0
+                        await send(websocket, {"type": "status", "data": "ready"})
+
+            elif msg_type == "config":
+                target_language = msg.get("targetLanguage", "French")
+                logger.info(f"Omni config: target={target_language}")
 
-            elif msg["type"] == "stop":
+            elif msg_type == "stop":
                 logger.info("Omni stop received")
                 break
 
@@ -182,11 +345,162 @@ async def ws_omni(websocket: WebSocket):
     except Exception as e:
         logger.error(f"Omni WebSocket error: {e}")
         try:
-            await websocket.send_json({"type": "error", "message": str(e)})
+            await send(websocket, {"type": "error", "message": str(e)})
         except Exception:
             pass
 
 
+MAX_CONTEXT_TURNS = 6  # prior user/assistant turns kept as translation context
+
+
+@dataclass
+class PipelineState:
+    """Per-connection state shared by ws_pipeline and its translation / TTS workers."""
+
+    websocket: WebSocket
+    loop: asyncio.AbstractEventLoop
+    target_language: str = "French"
+
+    # Translation queue — worker processes draft and refine jobs sequentially
+    # Queue items: None (shutdown) or dict {"type": "draft"/"refine", ...}
+    translate_queue: asyncio.Queue = field(default_factory=asyncio.Queue)
+
+    # TTS queue — serializes TTS calls so they don't collide (model isn't thread-safe)
+    tts_queue: asyncio.Queue = field(default_factory=asyncio.Queue)
+
+    # Context: list of prior user/assistant turns for multi-turn chat translation
+    translation_context_turns: list[dict] = field(default_factory=list)
+
+    # Draft+Refine architecture:
+    # - "draft" jobs produce fast translations shown immediately (no TTS, no context)
+    # - "refine" jobs re-translate accumulated source with context → replace drafts, run TTS
+    draft_source_chunks: list[str] = field(default_factory=list)
+    draft_count_since_refine: int = 0
+    refine_queued: bool = False
+
+
+def find_stable_prefix_len(prev_words: list[str], curr_words: list[str]) -> int:
+    """Find how many words from the start match between two consecutive ASR outputs."""
+    common = 0
+    for i in range(min(len(prev_words), len(curr_words))):
+        if prev_words[i].lower() == curr_words[i].lower():
+            common = i + 1
+        else:
+            break
+    return common
+
+
+async def translation_worker(state: PipelineState):
+    """Background task: process draft and refine translation jobs.
+    Draft = fast translation shown immediately (no TTS, no context).
+    Refine = re-translate accumulated source with context, replace drafts, run TTS."""
+    from models.pipeline import sentence_stream  # already imported by load_pipeline
+
+    translation_model = MODELS["translation"]
+    try:
+        while True:
+            job = await state.translate_queue.get()
+            if job is None:
+                state.translate_queue.task_done()
+                break
+            try:
+                if job["type"] == "draft":
+                    text = job["text"]
+                    logger.info(f"[Pipeline] Draft translate: '{text.strip()}'")
+                    full_translation = ""
+                    # The streamer blocks until the next token — pull each one off the event loop
+                    stream = translation_model.translate_stream(text.strip(), state.target_language)
+                    while (text_chunk := await state.loop.run_in_executor(STREAM_EXECUTOR, next, stream, None)) is not None:
+                        full_translation += text_chunk
+                        await send(state.websocket, {"type": "translated_text_draft", "data": text_chunk})
+                    await send(state.websocket, {"type": "translated_text_draft", "data": " "})
+                    logger.info(f"[Pipeline] Draft result: '{full_translation.strip()}'")
+
+                    state.draft_source_chunks.append(text.strip())
+                    state.draft_count_since_refine += 1
+
+                    # Auto-trigger refine after 3 drafts or sentence boundary
+                    has_sentence_end = bool(SENT_END_RE.search(text.strip()))
+                    if (state.draft_count_since_refine >= 3 or has_sentence_end) and not state.refine_queued:
+                        state.translate_queue.put_nowait({"type": "refine"})
+                        state.refine_queued = True
+
+                elif job["type"] == "refine":
+                    state.refine_queued = False
+                    if not state.draft_source_chunks:
+                        continue  # Nothing to refine
+
+                    source = " ".join(state.draft_source_chunks)
+                    logger.info(f"[Pipeline] Refining: '{source}' (context: {len(state.translation_context_turns)} turns)")
+                    full_translation = ""
+                    sentences = sentence_stream(translation_model.translate_stream(
+                        source.strip(), state.target_language,
+                        context_turns=state.translation_context_turns if state.translation_context_turns else None
+                    ))
+                    while (sentence := await state.loop.run_in_executor(STREAM_EXECUTOR, next, sentences, None)) is not None:
+                        full_translation += sentence
+                        # Queue TTS per sentence — runs in separate worker, overlapping the rest of the translation
+                        if sentence.strip():
+                            state.tts_queue.put_nowait(sentence.strip())
+
+                    # Send complete refined text — frontend replaces all drafts
+                    await send(state.websocket, {"type": "translated_text_final", "data": full_translation.strip()})
+                    logger.info(f"[Pipeline] Refined: '{full_translation.strip()}'")
+
+                    # Update context with refined translation only
+                    state.translation_context_turns.append({"role": "user", "content": source.strip()})
+                    state.translation_context_turns.append({"role": "assistant", "content": full_translation.strip()})
+                    while len(state.translation_context_turns) > MAX_CONTEXT_TURNS:
+                        state.translation_context_turns.pop(0)
+
+                    # Clear draft tracking for next cycle
+                    state.draft_source_chunks.clear()
+                    state.draft_count_since_refine = 0
+
+            except Exception as e:
+                logger.error(f"[Pipeline] Worker error: {e}")
+                await send(state.websocket, {"type": "error", "message": f"Translation failed: {e}"})
+            finally:
+                state.translate_queue.task_done()
+    except asyncio.CancelledError:
+        pass
+
+
+async def tts_worker(state: PipelineState):
+    """Background task: process TTS jobs sequentially (model isn't thread-safe)."""
+    tts_model = MODELS["tts"]
+    try:
+        while True:
+            text = await state.tts_queue.get()
+            if text is None:
+                state.tts_queue.task_done()
+                break
+            try:
+                logger.info(f"[Pipeline] TTS synthesizing: '{text[:50]}...'")
+                # Pull chunks off the sentence-by-sentence generator in the executor and send
+                # each as soon as it exists; partial=True until the utterance's last chunk
+                stream = tts_model.synthesize_stream(text, state.target_language)
+                while (item := await state.loop.run_in_executor(MODEL_EXECUTOR, next, stream, None)) is not None:
+                    audio_b64, is_last = item
+                    await send(state.websocket, {
+                        "type": "audio", "data": audio_b64, "sampleRate": tts_model.sample_rate,
+                        "partial": not is_last,
+                    })
+                logger.info("[Pipeline] TTS audio sent")
+            except Exception as e:
+                logger.error(f"[Pipeline] TTS failed: {e}")
+            finally:
+                state.tts_queue.task_done()
+    except asyncio.CancelledError:
+        pass
+
+
+def queue_draft(state: PipelineState, text: str):
+    """Add a draft translation job to the queue."""
+    if text.strip() and not is_filler(text):
+        state.translate_queue.put_nowait({"type": "draft", "text": text})
+
+
 @app.websocket("/ws/pipeline")
 async def ws_pipeline(websocket: WebSocket):
     """Qwen3 ASR + Translation + TTS pipeline endpoint.
@@ -200,177 +514,61 @@ async def ws_pipeline(websocket: WebSocket):
     """
     await websocket.accept()
     logger.info("Pipeline WebSocket connected")
+    await send(websocket, {"type": "audio_config", "chunkSize": AUDIO_CHUNK_SIZE})
 
-    loop = asyncio.get_event_loop()
+    loop = asyncio.get_running_loop()
 
     # Lazy load: unload other models, load Pipeline
-    if not (asr_model.loaded and translation_model.loaded and tts_model.loaded and vad_detector.loaded):
+    if not all(is_loaded(name) for name in ("asr", "translation", "tts", "vad")):
         try:
             logger.info("Loading Pipeline models on demand...")
-            await websocket.send_json({"type": "status", "data": "loading_model"})
+            await send(websocket, {"type": "status", "data": "loading_model"})
             await loop.run_in_executor(None, load_pipeline)
         except Exception as e:
             logger.error(f"Failed to load Pipeline models: {e}")
-            await websocket.send_json({"type": "error", "message": f"Model load failed: {e}"})
+            await send(websocket, {"type": "error", "message": f"Model load failed: {e}"})
             await websocket.close()
             return
 
-    audio_buffer = np.array([], dtype=np.float32)
-    target_language = "French"
+    asr_model, vad_detector = MODELS["asr"], MODELS["vad"]  # translation/tts are bound by their workers
+
+    MAX_BUFFER_S = 15.0
+    MAX_BUFFER_SAMPLES = int(INPUT_SAMPLE_RATE * MAX_BUFFER_S)
+
+    audio_ring = AudioRing(MAX_BUFFER_SAMPLES)
     source_language = "English"
     asr_mode = "local"  # "local" = Qwen3-ASR, "browser" = client sends text
-    loop = asyncio.get_event_loop()
 
     # ASR tracking (local mode)
     ASR_INTERVAL_S = 1.0
+    ASR_INTERVAL_SAMPLES = int(INPUT_SAMPLE_RATE * ASR_INTERVAL_S)
+    # Past ASR_FULL_MAX_S, interim ASR re-decodes only the audio since the last run plus
+    # ASR_OVERLAP_S and splices it onto the previous text (the final ASR stays full-buffer)
+    ASR_FULL_MAX_SAMPLES = int(INPUT_SAMPLE_RATE * 4.0)
+    ASR_OVERLAP_SAMPLES = int(INPUT_SAMPLE_RATE * 2.0)
     last_asr_samples = 0
     last_asr_text = ""
 
+    # Speech-end VAD throttling: skip it right after ASR text changed (speech is clearly
+    # ongoing) and run it at most every VAD_MIN_INTERVAL_S
+    VAD_AFTER_ASR_CHANGE_S = 0.3
+    VAD_MIN_INTERVAL_S = 0.2
+    last_asr_change_time = 0.0
+    last_vad_time = 0.0
+
+    # Early-exit VAD gating (local ASR mode) — see ws_omni
+    speech_started = False
+    peak_speech_prob = 0.0
+
     # Stable prefix tracking for incremental translation (local ASR mode)
     prev_asr_words: list[str] = []
     translated_word_count = 0
 
     # Text mode tracking (browser ASR mode) — position-based, not prefix-based
     text_translated_up_to = 0  # character position up to which we've already translated
-    last_text_translate_time = asyncio.get_event_loop().time()
-
-    # Translation queue — worker processes draft and refine jobs sequentially
-    # Queue items: None (shutdown) or dict {"type": "draft"/"refine", ...}
-    translate_queue: asyncio.Queue[dict | None] = asyncio.Queue()
-
-    # TTS queue — serializes TTS calls so they don't collide (model isn't thread-safe)
-    tts_queue: asyncio.Queue[str | None] = asyncio.Queue()
-
-    # Context: list of prior user/assistant turns for multi-turn chat translation
-    translation_context_turns: list[dict] = []
-    MAX_CONTEXT_TURNS = 6
-
-    # Draft+Refine architecture:
-    # - "draft" jobs produce fast translations shown immediately (no TTS, no context)
-    # - "refine" jobs re-translate accumulated source with context → replace drafts, run TTS
-    draft_source_chunks: list[str] = []
-    draft_count_since_refine = 0
-    refine_queued = False
-
-    MAX_BUFFER_S = 15.0
-
-    FILLER_WORDS = {'the', 'okay', 'um', 'uh', 'ah', 'oh', 'hmm', 'hm', 'a', 'an', ''}
+    last_text_translate_time = loop.time()
 
-    def is_filler(text: str) -> bool:
-        cleaned = text.strip().rstrip('.')
-        words = [w.strip().lower() for w in cleaned.split() if w.strip()]
-        meaningful = [w for w in words if w not in FILLER_WORDS]
-        return len(meaningful) == 0
-
-    def find_stable_prefix_len(prev_words: list[str], curr_words: list[str]) -> int:
-        """Find how many words from the start match between two consecutive ASR outputs."""
-        common = 0
-        for i in range(min(len(prev_words), len(curr_words))):
-            if prev_words[i].lower() == curr_words[i].lower():
-                common = i + 1
-            else:
-                break
-        return common
-
-    async def translation_worker():
-        """Background task: process draft and refine translation jobs.
-        Draft = fast translation shown immediately (no TTS, no context).
-        Refine = re-translate accumulated source with context, replace drafts, run TTS."""
-        nonlocal draft_count_since_refine, refine_queued
-        try:
-            while True:
-                job = await translate_queue.get()
-                if job is None:
-                    translate_queue.task_done()
-                    break
-                try:
-                    if job["type"] == "draft":
-                        text = job["text"]
-                        logger.info(f"[Pipeline] Draft translate: '{text.strip()}'")
-                        full_translation = ""
-                        for text_chunk in translation_model.translate_stream(text.strip(), target_language):
-                            full_translation += text_chunk
-                            await websocket.send_json({"type": "translated_text_draft", "data": text_chunk})
-                        await websocket.send_json({"type": "translated_text_draft", "data": " "})
-                        logger.info(f"[Pipeline] Draft result: '{full_translation.strip()}'")
-
-                        draft_source_chunks.append(text.strip())
-                        draft_count_since_refine += 1
-
-                        # Auto-trigger refine after 3 drafts or sentence boundary
-                        has_sentence_end = bool(re.search(r'[.!?]$', text.strip()))
-                        if (draft_count_since_refine >= 3 or has_sentence_end) and not refine_queued:
-                            translate_queue.put_nowait({"type": "refine"})
-                            refine_queued = True
-
-                    elif job["type"] == "refine":
-                        refine_queued = False
-                        if not draft_source_chunks:
-                            continue  # Nothing to refine
-
-                        source = " ".join(draft_source_chunks)
-                        logger.info(f"[Pipeline] Refining: '{source}' (context: {len(translation_context_turns)} turns)")
-                        full_translation = ""
-                        for text_chunk in translation_model.translate_stream(
-                            source.strip(), target_language,
-                            context_turns=translation_context_turns if translation_context_turns else None
-                        ):
-                            full_translation += text_chunk
-
-                        # Send complete refined text — frontend replaces all drafts
-                        await websocket.send_json({"type": "translated_text_final", "data": full_translation.strip()})
-                        logger.info(f"[Pipeline] Refined: '{full_translation.strip()}'")
-
-                        # Update context with refined translation only
-                        translation_context_turns.append({"role": "user", "content": source.strip()})
-                        translation_context_turns.append({"role": "assistant", "content": full_translation.strip()})
-                        while len(translation_context_turns) > MAX_CONTEXT_TURNS:
-                            translation_context_turns.pop(0)
-
-                        # Queue TTS — runs in separate worker, doesn't block translation
-                        if full_translation.strip():
-                            tts_queue.put_nowait(full_translation.strip())
-
-                        # Clear draft tracking for next cycle
-                        draft_source_chunks.clear()
-                        draft_count_since_refine = 0
-
-                except Exception as e:
-                    logger.error(f"[Pipeline] Worker error: {e}")
-                    await websocket.send_json({"type": "error", "message": f"Translation failed: {e}"})
-                finally:
-                    translate_queue.task_done()
-        except asyncio.CancelledError:
-            pass
-
-    async def tts_worker():
-        """Background task: process TTS jobs sequentially (model isn't thread-safe)."""
-        try:
-            while True:
-                text = await tts_queue.get()
-                if text is None:
-                    tts_queue.task_done()
-                    break
-                try:
-                    logger.info(f"[Pipeline] TTS synthesizing: '{text[:50]}...'")
-                    audio_b64 = await loop.run_in_executor(
-                        None, tts_model.synthesize, text, target_language
-                    )
-                    await websocket.send_json({
-                        "type": "audio", "data": audio_b64, "sampleRate": tts_model.sample_rate,
-                    })
-                    logger.info("[Pipeline] TTS audio sent")
-                except Exception as e:
-                    logger.error(f"[Pipeline] TTS failed: {e}")
-                finally:
-                    tts_queue.task_done()
-        except asyncio.CancelledError:
-            pass
-
-    def queue_draft(text: str):
-        """Add a draft translation job to the queue."""
-        if text.strip() and not is_filler(text):
-            translate_queue.put_nowait({"type": "draft", "text": text})
+    state = PipelineState(websocket=websocket, loop=loop)
 
     def check_stable_and_translate(current_words: list[str]):
         """Check stable prefix and queue translation if enough new words."""
@@ -391,34 +589,40 @@ async def ws_pipeline(websocket: WebSocket):
         if is_filler(new_stable_text):
             return
 
-        has_sentence_boundary = bool(re.search(r'[.!?,;:]', new_stable_text))
+        has_sentence_boundary = bool(SENT_BOUND_RE.search(new_stable_text))
         if new_stable_count >= 5 or has_sentence_boundary:
             logger.info(f"[Pipeline] Stable translate ({new_stable_count} words): '{new_stable_text}'")
             translated_word_count = stable_len
-            queue_draft(new_stable_text)
+            queue_draft(state, new_stable_text)
 
     async def flush_buffer():
         """Finalize current buffer: final ASR, queue remaining translation, clear state."""
-        nonlocal audio_buffer, last_asr_samples, last_asr_text, prev_asr_words, translated_word_count, refine_queued
+        nonlocal last_asr_samples, last_asr_text, prev_asr_words, translated_word_count
+        nonlocal speech_started, peak_speech_prob
 
-        if len(audio_buffer) < INPUT_SAMPLE_RATE * MIN_SPEECH_DURATION_S:
-            # Too short, just clear
-            audio_buffer = np.array([], dtype=np.float32)
+        not_speech = VAD_DROP_LOW_CONFIDENCE and vad_detector.loaded and peak_speech_prob < VAD_THRESHOLD
+        if len(audio_ring) < MIN_SPEECH_SAMPLES or not_speech:
+            # Too short or never scored as speech, just clear
+            audio_ring.reset()
             last_asr_samples = 0
             last_asr_text = ""
             prev_asr_words = []
             translated_word_count = 0
+            speech_started = False
+            peak_speech_prob = 0.0
             return
 
         try:
+            # View, not a copy — flush_buffer is awaited from the receive loop, so the ring
+            # isn't touched until it's reset below
             final_text = await loop.run_in_executor(
-                None, asr_model.transcribe, audio_buffer.copy(), INPUT_SAMPLE_RATE, source_language
+                MODEL_EXECUTOR, asr_model.transcribe, audio_ring.view(), INPUT_SAMPLE_RATE, source_language
             )
             final_text = final_text.strip()
 
             if final_text and not is_filler(final_text):
                 logger.info(f"[Pipeline] ASR final: '{final_text}'")
-                await websocket.send_json({"type": "source_text", "data": final_text})
+                await send(websocket, {"type": "source_text", "data": final_text})
 
                 # Queue remaining untranslated words
                 final_words = final_text.split()
@@ -426,92 +630,170 @@ async def ws_pipeline(websocket: WebSocket):
                     remaining = ' '.join(final_words[translated_word_count:])
                     if remaining.strip() and not is_filler(remaining):
                         logger.info(f"[Pipeline] Queue remaining: '{remaining}'")
-                        queue_draft(remaining)
+                        queue_draft(state, remaining)
 
         except Exception as e:
             logger.error(f"[Pipeline] Final ASR failed: {e}")
 
         # Trigger refine for any accumulated drafts on speech pause
-        if not refine_queued:
-            translate_queue.put_nowait({"type": "refine"})
-            refine_queued = True
+        if not state.refine_queued:
+            state.translate_queue.put_nowait({"type": "refine"})
+            state.refine_queued = True
 
         # Clear state for next utterance
-        audio_buffer = np.array([], dtype=np.float32)
+        audio_ring.reset()
         last_asr_samples = 0
         last_asr_text = ""
         prev_asr_words = []
         translated_word_count = 0
+        speech_started = False
+        peak_speech_prob = 0.0
 
-    # Start workers
-    worker_task = asyncio.create_task(translation_worker())
-    tts_task = asyncio.create_task(tts_worker())
+    # Start workers. The reader keeps draining the socket while ASR/VAD run, so a slow
+    # ASR call never stalls audio ingest; the loop below consumes from inbox.
+    inbox: asyncio.Queue[dict | BaseException] = asyncio.Queue()
+    reader_task = asyncio.create_task(websocket_reader(websocket, inbox))
+    worker_task = asyncio.create_task(translation_worker(state))
+    tts_task = asyncio.create_task(tts_worker(state))
+    pending_msg: dict | BaseException | None = None  # non-audio message pulled while coalescing
 
     try:
-        await websocket.send_json({"type": "status", "data": "ready"})
+        await send(websocket, {"type": "status", "data": "ready"})
 
         while True:
-            try:
-                raw = await asyncio.wait_for(websocket.receive_text(), timeout=3.0)
-            except asyncio.TimeoutError:
-                # No message for 3s — trigger refine if there are unrefined drafts
-                if draft_source_chunks and not refine_queued:
-                    logger.info("[Pipeline] Timeout → triggering refine for pending drafts")
-                    translate_queue.put_nowait({"type": "refine"})
-                    refine_queued = True
-                continue
-            msg = json.loads(raw)
-
-            if msg["type"] == "config":
-                target_language = msg.get("targetLanguage", "French")
-                source_language = "French" if target_language == "English" else "English"
-                asr_mode = msg.get("asrMode", "local")
-                logger.info(f"Pipeline config: source={source_language} → target={target_language}, asr={asr_mode}")
-
-            elif msg["type"] == "audio":
-                chunk = decode_pcm_base64(msg["data"])
-                audio_buffer = np.concatenate([audio_buffer, chunk])
-
-                # --- Run ASR periodically for live source text + incremental translation ---
-                new_samples = len(audio_buffer) - last_asr_samples
-                if asr_model.loaded and new_samples >= INPUT_SAMPLE_RATE * ASR_INTERVAL_S:
+            if pending_msg is not None:
+                msg, pending_msg = pending_msg, None
+            else:
+                try:
+                    msg = await asyncio.wait_for(inbox.get(), timeout=3.0)
+                except asyncio.TimeoutError:
+                    # No message for 3s — trigger refine if there are unrefined drafts
+                    if state.draft_source_chunks and not state.refine_queued:
+                        logger.info("[Pipeline] Timeout → triggering refine for pending drafts")
+                        state.translate_queue.put_nowait({"type": "refine"})
+                        state.refine_queued = True
+                    continue
+            if isinstance(msg, BaseException):
+                raise msg
+            msg_type = msg["type"]
+
+            if msg_type == "audio":
+                # Coalesce audio that queued up during the last ASR/VAD pass into one gate/ASR/VAD pass
+                start = len(audio_ring)
+                buffer_audio_msg(audio_ring, msg)
+                while not inbox.empty():
+                    queued = inbox.get_nowait()
+                    if isinstance(queued, BaseException) or queued["type"] != "audio":
+                        pending_msg = queued
+                        break
+                    buffer_audio_msg(audio_ring, queued)
+                chunk = audio_ring.view()[start:]  # view of the samples just buffered
+
+                # --- Early-exit VAD gate: don't buffer (or ASR) leading non-speech ---
+                if vad_detector.loaded and peak_speech_prob < VAD_HIGH_CONFIDENCE_THRESHOLD:
                     try:
-                        current_text = await loop.run_in_executor(
-                            None, asr_model.transcribe, audio_buffer.copy(), INPUT_SAMPLE_RATE, source_language
+                        chunk_prob = await loop.run_in_executor(
+                            AUDIO_EXECUTOR, vad_detector.speech_prob, chunk, INPUT_SAMPLE_RATE
                         )
-                        current_text = current_text.strip()
+                    except Exception as e:
+                        logger.warning(f"[Pipeline] VAD speech_prob failed, keeping chunk as speech: {e}")
+                        chunk_prob = VAD_THRESHOLD
+                    if not speech_started and chunk_prob < VAD_EARLY_EXIT_THRESHOLD:
+                        # Keep only this chunk as pre-roll so the first word's onset isn't clipped
+                        audio_ring.consume(len(audio_ring) - len(chunk))
+                        continue
+                    speech_started = True
+                    peak_speech_prob = max(peak_speech_prob, chunk_prob)
+
+                # --- Start interim ASR and speech-end VAD together (both only read the ring) ---
+                new_samples = len(audio_ring) - last_asr_samples
+                asr_job = vad_job = None
+                asr_window_start = 0
+                if asr_model.loaded and new_samples >= ASR_INTERVAL_SAMPLES:
+                    if last_asr_text and len(audio_ring) > ASR_FULL_MAX_SAMPLES:
+                        asr_window_start = max(0, last_asr_samples - ASR_OVERLAP_SAMPLES)
+                    asr_job = loop.run_in_executor(
+                        MODEL_EXECUTOR, asr_model.transcribe, audio_ring.view()[asr_window_start:],
+                        INPUT_SAMPLE_RATE, source_language,
+                    )
+                now = loop.time()
+                if (
+                    vad_detector.loaded
+                    and len(audio_ring) > VAD_MIN_SAMPLES
+                    and now - last_asr_change_time > VAD_AFTER_ASR_CHANGE_S
+                    and now - last_vad_time >= VAD_MIN_INTERVAL_S
+                ):
+                    last_vad_time = now
+                    silence_ms = speech_end_silence_ms(peak_speech_prob)
+                    has_silence = rms_speech_end(audio_ring, silence_ms)
+                    if has_silence is None:
+                        # Snapshot the tail: the ring keeps being appended to / consumed while the job runs
+                        vad_tail = audio_ring.tail(int(silence_ms / 1000 * INPUT_SAMPLE_RATE)).copy()
+                        vad_job = loop.run_in_executor(
+                            AUDIO_EXECUTOR, vad_detector.detect_speech_end, vad_tail, INPUT_SAMPLE_RATE, silence_ms
+                        )
+                    else:
+                        vad_job = loop.create_future()
+                        vad_job.set_result(has_silence)
+
+                # --- Interim ASR → live source text + incremental translation ---
+                if asr_job is not None:
+                    try:
+                        current_text = (await asr_job).strip()
+                        if asr_window_start:
+                            prev_words = last_asr_text.split()
+                            # Word in the previous transcript where the tail window should begin
+                            expected_start = len(prev_words) * asr_window_start // last_asr_samples
+                            spliced = splice_transcripts(prev_words, current_text.split(), expected_start)
+                            if spliced is not None:
+                                current_text = " ".join(spliced)
+                            else:
+                                # No overlap anchor — re-transcribe the whole buffer
+                                current_text = (await loop.run_in_executor(
+                                    MODEL_EXECUTOR, asr_model.transcribe, audio_ring.view(),
+                                    INPUT_SAMPLE_RATE, source_language,
+                                )).strip()
 
                         if current_text and current_text != last_asr_text:
                             if not is_filler(current_text):
                                 logger.info(f"[Pipeline] ASR interim: '{current_text}'")
-                                await websocket.send_json({
+                                await send(websocket, {
                                     "type": "source_text_interim",
                                     "data": current_text,
                                 })
                                 last_asr_text = current_text
+                                last_asr_change_time = loop.time()
 
                                 check_stable_and_translate(current_text.split())
                     except Exception as e:
                         logger.warning(f"[Pipeline] ASR failed: {e}")
 
-                    last_asr_samples = len(audio_buffer)
+                    last_asr_samples = len(audio_ring)
 
                 # --- VAD: detect silence → flush buffer ---
-                if vad_detector.loaded and len(audio_buffer) > INPUT_SAMPLE_RATE * 0.5:
-                    has_silence = await loop.run_in_executor(
-                        None, vad_detector.detect_speech_end, audio_buffer, INPUT_SAMPLE_RATE
-                    )
+                if vad_job is not None:
+                    try:
+                        has_silence = await vad_job
+                    except Exception as e:
+                        logger.warning(f"[Pipeline] VAD speech-end check failed: {e}")
+                        has_silence = False
 
-                    if has_silence and len(audio_buffer) > INPUT_SAMPLE_RATE * MIN_SPEECH_DURATION_S:
+                    if has_silence and len(audio_ring) > MIN_SPEECH_SAMPLES:
                         await flush_buffer()
-                        await websocket.send_json({"type": "status", "data": "ready"})
+                        await send(websocket, {"type": "status", "data": "ready"})
 
                 # --- Auto-flush if buffer too long (prevents ASR slowdown) ---
-                elif len(audio_buffer) > INPUT_SAMPLE_RATE * MAX_BUFFER_S:
+                elif len(audio_ring) > MAX_BUFFER_SAMPLES:
                     logger.info(f"[Pipeline] Auto-flush: buffer exceeded {MAX_BUFFER_S}s")
                     await flush_buffer()
 
-            elif msg["type"] == "text":
+            elif msg_type == "config":
+                state.target_language = msg.get("targetLanguage", "French")
+                source_language = "French" if state.target_language == "English" else "English"
+                asr_mode = msg.get("asrMode", "local")
+                logger.info(f"Pipeline config: source={source_language} → target={state.target_language}, asr={asr_mode}")
+
+            elif msg_type == "text":
                 # Browser ASR mode — text comes from client, skip local ASR
                 # Uses character position tracking (not prefix matching) to handle
                 # browser Speech API revising capitalization/punctuation in interim results
@@ -532,16 +814,16 @@ async def ws_pipeline(websocket: WebSocket):
                 if is_final:
                     logger.info(f"[Pipeline/Text] Final translate: '{new_content}'")
                     text_translated_up_to = len(text)
-                    last_text_translate_time = asyncio.get_event_loop().time()
-                    queue_draft(new_content)
+                    last_text_translate_time = loop.time()
+                    queue_draft(state, new_content)
                     # Final result — trigger refine for accumulated drafts
-                    if not refine_queued:
-                        translate_queue.put_nowait({"type": "refine"})
-                        refine_queued = True
+                    if not state.refine_queued:
+                        state.translate_queue.put_nowait({"type": "refine"})
+                        state.refine_queued = True
                 else:
-                    now = asyncio.get_event_loop().time()
+                    now = loop.time()
                     time_since = now - last_text_translate_time
-                    has_sentence = bool(re.search(r'[.!?,;:]', new_content))
+                    has_sentence = bool(SENT_BOUND_RE.search(new_content))
                     word_count = len(new_content.split())
                     time_trigger = time_since >= 2.0 and word_count >= 2
 
@@ -550,9 +832,9 @@ async def ws_pipeline(websocket: WebSocket):
                         logger.info(f"[Pipeline/Text] Translate trigger ({trigger}): '{new_content}'")
                         text_translated_up_to = len(text)
                         last_text_translate_time = now
-                        queue_draft(new_content)
+                        queue_draft(state, new_content)
 
-            elif msg["type"] == "stop":
+            elif msg_type == "stop":
                 logger.info("Pipeline stop received")
                 break
 
@@ -561,13 +843,14 @@ async def ws_pipeline(websocket: WebSocket):
     except Exception as e:
         logger.error(f"Pipeline WebSocket error: {e}")
         try:
-            await websocket.send_json({"type": "error", "message": str(e)})
+            await send(websocket, {"type": "error", "message": str(e)})
         except Exception:
             pass
     finally:
-        # Shutdown workers
-        translate_queue.put_nowait(None)
-        tts_queue.put_nowait(None)
+        # Shutdown reader + workers
+        reader_task.cancel()
+        state.translate_queue.put_nowait(None)
+        state.tts_queue.put_nowait(None)
         worker_task.cancel()
         tts_task.cancel()
         try:
@@ -591,7 +874,8 @@ async def ws_personaplex(websocket: WebSocket):
        a. Encode frame with Mimi
        b. Step LMGen with input codes
        c. Decode output codes with Mimi
-       d. Send text token + audio chunk to client
+       d. Send text token (JSON) + audio chunk (binary PCM Int16) to client
+          (audio-only frames are batched AUDIO_FRAMES_PER_SEND at a time)
     """
     await websocket.accept()
     logger.info("PersonaPlex WebSocket connected")
@@ -599,88 +883,113 @@ async def ws_personaplex(websocket: WebSocket):
     PERSONAPLEX_SAMPLE_RATE = 24000
     FRAME_RATE = 12.5
     FRAME_SIZE = int(PERSONAPLEX_SAMPLE_RATE / FRAME_RATE)  # 1920 samples
+    AUDIO_FRAMES_PER_SEND = 2  # with no text token, send 160ms of audio per message
 
-    audio_buffer = np.array([], dtype=np.float32)
+    audio_ring = FrameRing(FRAME_SIZE * 8, FRAME_SIZE)
+
+    # Output staging: int16 PCM for up to AUDIO_FRAMES_PER_SEND frames, reused for every send
+    out_i16 = np.empty(FRAME_SIZE * AUDIO_FRAMES_PER_SEND, dtype=np.int16)
+    out_len = 0  # samples staged
+    out_frames = 0  # frames staged
     target_language = "French"
-    loop = asyncio.get_event_loop()
+    loop = asyncio.get_running_loop()
 
     # Lazy load: unload other models, load PersonaPlex
-    if not personaplex_model.loaded:
+    if not is_loaded("personaplex"):
         try:
             logger.info("Loading PersonaPlex model on demand...")
-            await websocket.send_json({"type": "status", "data": "loading_model"})
+            await send(websocket, {"type": "status", "data": "loading_model"})
             await loop.run_in_executor(None, load_personaplex)
         except Exception as e:
             logger.error(f"Failed to load PersonaPlex model: {e}")
-            await websocket.send_json({"type": "error", "message": f"Model load failed: {e}"})
+            await send(websocket, {"type": "error", "message": f"Model load failed: {e}"})
             await websocket.close()
             return
 
+    personaplex_model = MODELS["personaplex"]
+
     # Reset streaming state for new session
     personaplex_model.reset()
 
+    async def stage_audio(audio_out: np.ndarray):
+        """Convert one frame of float32 output to int16 into the staging buffer (sending it first if full)."""
+        nonlocal out_i16, out_len, out_frames
+        n = len(audio_out)
+        if out_len + n > len(out_i16):
+            await send_frame()
+            if n > len(out_i16):
+                out_i16 = np.empty(n * AUDIO_FRAMES_PER_SEND, dtype=np.int16)
+        # Clip + scale in place on the decoder's own buffer, then cast straight into the staging buffer
+        np.clip(audio_out, -1.0, 1.0, out=audio_out)
+        np.multiply(audio_out, 32767.0, out=audio_out)
+        np.copyto(out_i16[out_len:out_len + n], audio_out, casting="unsafe")
+        out_len += n
+        out_frames += 1
+
+    async def send_frame(text: str = ""):
+        """Send the text token (JSON) and all staged output audio (one binary PCM Int16 message)."""
+        nonlocal out_len, out_frames
+        if text:
+            await send(websocket, {"type": "translated_text", "data": text})
+        if out_len:
+            await websocket.send_bytes(out_i16[:out_len].tobytes())
+            out_len = out_frames = 0
+
     try:
-        await websocket.send_json({"type": "status", "data": "ready"})
+        await send(websocket, {"type": "status", "data": "ready"})
 
         while True:
-            raw = await websocket.receive_text()
-            msg = json.loads(raw)
+            msg = await receive_msg(websocket)
+            msg_type = msg["type"]
 
-            if msg["type"] == "config":
-                target_language = msg.get("targetLanguage", "French")
-                logger.info(f"PersonaPlex config: target={target_language}")
-                # Update the translation persona prompt
-                await loop.run_in_executor(
-                    None, personaplex_model.update_text_prompt, target_language
-                )
-                personaplex_model.reset()
-
-            elif msg["type"] == "audio":
-                chunk = decode_pcm_base64(msg["data"])
-                audio_buffer = np.concatenate([audio_buffer, chunk])
+            if msg_type == "audio":
+                if "pcm" in msg:
+                    audio_ring.append_pcm16(msg["pcm"])
+                else:
+                    audio_ring.append(decode_pcm_base64(msg["data"]))
 
-                # Process complete frames
-                while len(audio_buffer) >= FRAME_SIZE:
-                    frame = audio_buffer[:FRAME_SIZE]
-                    audio_buffer = audio_buffer[FRAME_SIZE:]
+                # Process complete frames — views into the ring, so nothing is shifted or copied
+                while len(audio_ring) >= FRAME_SIZE:
+                    frame = audio_ring.pop_frame()
 
                     try:
-                        # 1. Encode input frame to Mimi codes
-                        input_codes = await loop.run_in_executor(
-                            None, personaplex_model.encode_audio, frame
+                        # 1-3. Encode frame with Mimi, step LMGen, decode output codes — one executor hop
+                        # (pipelined over CUDA streams when enabled: returns the previous frame's output)
+                        audio_out, text_token = await loop.run_in_executor(
+                            MODEL_EXECUTOR, personaplex_model.pipelined_step, frame
                         )
 
-                        # 2. Step LMGen: get output codes + text token
-                        output_codes, text_token = await loop.run_in_executor(
-                            None, personaplex_model.step, input_codes
-                        )
+                        if audio_out is not None:
+                            await stage_audio(audio_out)
 
-                        # 3. Send text token if non-empty
-                        if text_token:
-                            await websocket.send_json({
-                                "type": "translated_text",
-                                "data": text_token,
-                            })
-
-                        # 4. Decode output audio codes and send
-                        if output_codes is not None:
-                            audio_out = await loop.run_in_executor(
-                                None, personaplex_model.decode_audio, output_codes
-                            )
-                            # Convert float32 to int16 PCM base64
-                            audio_int16 = np.clip(audio_out * 32767, -32768, 32767).astype(np.int16)
-                            audio_b64 = base64.b64encode(audio_int16.tobytes()).decode("ascii")
-                            await websocket.send_json({
-                                "type": "audio",
-                                "data": audio_b64,
-                                "sampleRate": PERSONAPLEX_SAMPLE_RATE,
-                            })
+                        # 4. Send text token + audio together; batch audio-only frames
+                        if text_token or out_frames >= AUDIO_FRAMES_PER_SEND:
+                            await send_frame(text_token or "")
 
                     except Exception as e:
                         logger.warning(f"PersonaPlex frame processing error: {e}")
 
-            elif msg["type"] == "stop":
+            elif msg_type == "config":
+                target_language = msg.get("targetLanguage", "French")
+                logger.info(f"PersonaPlex config: target={target_language}")
+                # Update the translation persona prompt
+                await loop.run_in_executor(
+                    MODEL_EXECUTOR, personaplex_model.update_text_prompt, target_language
+                )
+                personaplex_model.reset()
+
+            elif msg_type == "stop":
                 logger.info("PersonaPlex stop received")
+                text_token = ""
+                try:
+                    # pipelined_step returns frame N-1 — collect the last frame still in flight
+                    audio_out, text_token = await loop.run_in_executor(MODEL_EXECUTOR, personaplex_model.flush)
+                    if audio_out is not None:
+                        await stage_audio(audio_out)
+                except Exception as e:
+                    logger.warning(f"PersonaPlex flush error: {e}")
+                if out_len or text_token:
+                    await send_frame(text_token)
                 break
 
     except WebSocketDisconnect:
@@ -688,7 +997,7 @@ async def ws_personaplex(websocket: WebSocket):
     except Exception as e:
         logger.error(f"PersonaPlex WebSocket error: {e}")
         try:
-            await websocket.send_json({"type": "error", "message": str(e)})
+            await send(websocket, {"type": "error", "message": str(e)})
         except Exception:
             pass
 
@@ -696,4 +1005,13 @@ async def ws_personaplex(websocket: WebSocket):
 if __name__ == "__main__":
     import uvicorn
 
-    uvicorn.run("main:app", host=HOST, port=PORT, reload=True)
+    uvicorn.run(
+        "main:app",
+        host=HOST,
+        port=PORT,
+        loop=UVICORN_LOOP,
+        http=UVICORN_HTTP,
+        ws=UVICORN_WS,
+        workers=UVICORN_WORKERS,
+        reload=UVICORN_RELOAD,
+    )
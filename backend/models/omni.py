@@ -1,10 +1,13 @@
-import base64
+import contextlib
 import struct
 import logging
 import numpy as np
 import torch
+from torch.nn.attention import sdpa_kernel
 from transformers import AutoModelForCausalLM, AutoProcessor, AutoTokenizer
-from config import OMNI_MODEL_NAME, DEVICE_MAP, TORCH_DTYPE, ATTN_IMPLEMENTATION, INPUT_SAMPLE_RATE, OUTPUT_SAMPLE_RATE, VAD_THRESHOLD, VAD_SILENCE_DURATION_MS
+from config import OMNI_MODEL_NAME, DEVICE_MAPS, LOW_CPU_MEM_USAGE, build_quant_config, TORCH_DTYPE, ATTN_IMPLEMENTATION, SDPA_KERNELS, INPUT_SAMPLE_RATE, OUTPUT_SAMPLE_RATE, VAD_SILENCE_DURATION_MS
+from audio import AudioRing, float_to_pcm16, pcm16_b64
+from models.vad import load_vad, max_speech_prob, tail_is_silence
 
 logger = logging.getLogger(__name__)
 
@@ -23,49 +26,33 @@ class OmniModel:
 
         self.processor = AutoProcessor.from_pretrained(OMNI_MODEL_NAME, trust_remote_code=True)
         self.tokenizer = AutoTokenizer.from_pretrained(OMNI_MODEL_NAME, trust_remote_code=True)
-        dtype = torch.float16 if TORCH_DTYPE == "float16" else torch.bfloat16
         self.model = AutoModelForCausalLM.from_pretrained(
             OMNI_MODEL_NAME,
-            torch_dtype=dtype,
-            device_map=DEVICE_MAP,
+            torch_dtype=TORCH_DTYPE,
+            device_map=DEVICE_MAPS["omni"],
+            low_cpu_mem_usage=LOW_CPU_MEM_USAGE,
             attn_implementation=ATTN_IMPLEMENTATION,
+            quantization_config=build_quant_config(),
             trust_remote_code=True,
         )
         self.model.eval()
 
-        # Load silero VAD
-        self.vad_model, vad_utils = torch.hub.load(
-            repo_or_dir="snakers4/silero-vad",
-            model="silero_vad",
-            trust_repo=True,
-        )
-        self.vad_get_speech_timestamps = vad_utils[0]
+        # Load VAD (silero or TEN, see VAD_BACKEND)
+        self.vad_model, vad_utils = load_vad()
+        self.vad_get_speech_timestamps = vad_utils[0] if vad_utils else None
 
         self.loaded = True
         logger.info("Omni model loaded successfully")
 
-    def detect_speech_end(self, audio_np: np.ndarray, sample_rate: int) -> bool:
-        """Use silero VAD to detect if speech has ended (silence at the tail).
-        Silero VAD requires exactly 512 samples per call at 16kHz."""
-        window_size = 512 if sample_rate == 16000 else 256
-        num_tail_windows = int(VAD_SILENCE_DURATION_MS / 1000 * sample_rate / window_size)
-        num_tail_windows = max(num_tail_windows, 2)
-
-        if len(audio_np) < window_size * num_tail_windows:
-            return False
-
-        # Check the last N windows — if all are below threshold, speech has ended
-        tail_start = len(audio_np) - (window_size * num_tail_windows)
-        for i in range(num_tail_windows):
-            chunk = audio_np[tail_start + i * window_size : tail_start + (i + 1) * window_size]
-            audio_tensor = torch.from_numpy(chunk).float()
-            if audio_tensor.abs().max() > 0:
-                audio_tensor = audio_tensor / audio_tensor.abs().max()
-            speech_prob = self.vad_model(audio_tensor, sample_rate).item()
-            if speech_prob >= VAD_THRESHOLD:
-                return False
-
-        return True
+    def detect_speech_end(
+        self, audio: np.ndarray | AudioRing, sample_rate: int, silence_ms: int = VAD_SILENCE_DURATION_MS
+    ) -> bool:
+        """Use the VAD to detect if speech has ended (silence_ms of silence at the tail)."""
+        return tail_is_silence(self.vad_model, audio, sample_rate, silence_ms)
+
+    def speech_prob(self, audio_np: np.ndarray, sample_rate: int) -> float:
+        """Peak VAD speech probability over a freshly received chunk (early-exit gating)."""
+        return max_speech_prob(self.vad_model, audio_np, sample_rate)
 
     def translate(self, audio_np: np.ndarray, sample_rate: int, target_language: str) -> dict:
         """
@@ -102,7 +89,11 @@ class OmniModel:
         )
         inputs = {k: v.to(self.model.device) for k, v in inputs.items()}
 
-        with torch.no_grad():
+        # Keep SDPA on the fused flash / memory-efficient kernels on CUDA
+        use_fused_sdpa = ATTN_IMPLEMENTATION == "sdpa" and torch.cuda.is_available()
+        kernels = sdpa_kernel(SDPA_KERNELS) if use_fused_sdpa else contextlib.nullcontext()
+
+        with torch.inference_mode(), kernels:
             outputs = self.model.generate(
                 **inputs,
                 modalities=["text", "audio"],
@@ -122,9 +113,7 @@ class OmniModel:
         # Extract audio output
         if hasattr(outputs, "audio") and outputs.audio is not None:
             audio_out = outputs.audio[0].cpu().numpy()
-            # Convert float32 to int16 PCM
-            audio_int16 = np.clip(audio_out * 32767, -32768, 32767).astype(np.int16)
-            result["audio"] = base64.b64encode(audio_int16.tobytes()).decode("ascii")
+            result["audio"] = pcm16_b64(float_to_pcm16(audio_out))
 
         return result
 
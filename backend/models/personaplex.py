@@ -6,6 +6,30 @@ import torch
 logger = logging.getLogger(__name__)
 
 
+def quantize_temporal_transformer(lm, mode: str):
+    """Weight-only quantize the LM's temporal transformer linears in place (torchao).
+
+    Batch-1 streaming decode is weight-bandwidth bound there; the Depformer and the
+    Mimi codec are small and quality-sensitive, so they stay in bf16. int4 needs CUDA.
+    """
+    try:
+        from torchao.quantization import Int4WeightOnlyConfig, Int8WeightOnlyConfig, quantize_
+    except ImportError as e:
+        raise ImportError(
+            f"PERSONAPLEX_QUANTIZATION={mode} needs torchao: {e}. "
+            "Install with: pip install -r requirements.txt"
+        )
+
+    if mode == "int8":
+        config = Int8WeightOnlyConfig()
+    elif mode == "int4":
+        config = Int4WeightOnlyConfig()
+    else:
+        raise ValueError(f"Unknown PERSONAPLEX_QUANTIZATION: {mode!r} (expected none, int8 or int4)")
+    logger.info(f"Quantizing PersonaPlex temporal transformer ({mode} weight-only)")
+    quantize_(lm.transformer, config)
+
+
 class PersonaPlexModel:
     """NVIDIA PersonaPlex-7B-V1 wrapper using moshi package components.
 
@@ -21,10 +45,21 @@ class PersonaPlexModel:
 
     def __init__(self):
         self.lm_gen = None       # LMGen streaming inference engine
-        self.mimi = None         # Mimi audio codec (for encoding input)
-        self.mimi_out = None     # Mimi audio codec (for decoding output)
+        self.mimi = None         # Mimi audio codec (encodes input, decodes output)
         self.tokenizer = None    # SentencePiece text tokenizer
+        self.piece_table: list[str] = []  # token id -> decoded text piece ("" for skipped ids)
         self.loaded = False
+        self.device = None
+        # Input frame staging, allocated once in load() when PIN_MEMORY: pinned host buffer → device buffer
+        self.pcm_host = None
+        self.pcm_dev = None
+        self.upload_done = None  # event: last H2D copy finished reading pcm_host
+        self.non_blocking = False
+        # CUDA streams for pipelined_step (PERSONAPLEX_CUDA_STREAMS), None = serial on the default stream
+        self.encode_stream = None
+        self.lm_stream = None
+        self.decode_stream = None
+        self.pending = None  # (LMGen output, ready event) of the frame whose audio is still to be decoded
         self.sample_rate = 24000
         self.frame_rate = 12.5   # Frames per second (one frame every 80ms)
         self.frame_size = int(self.sample_rate / self.frame_rate)  # 1920 samples per frame
@@ -36,7 +71,10 @@ class PersonaPlexModel:
             voice_prompt: Voice conditioning preset (e.g., "NATM1" for natural male voice 1).
             text_prompt: System prompt for the model. Defaults to translation persona.
         """
-        from config import PERSONAPLEX_MODEL_NAME, PERSONAPLEX_VOICE
+        from config import (
+            PERSONAPLEX_MODEL_NAME, PERSONAPLEX_VOICE, PERSONAPLEX_CUDA_STREAMS, PERSONAPLEX_COMPILE_MODE,
+            PERSONAPLEX_QUANTIZATION, DEVICE_MAPS, PIN_MEMORY, NON_BLOCKING_TRANSFER, USE_CUDA_GRAPHS,
+        )
 
         voice_prompt = voice_prompt or PERSONAPLEX_VOICE
 
@@ -53,19 +91,29 @@ class PersonaPlexModel:
                 "Install with: pip install moshi sentencepiece huggingface_hub"
             )
 
-        device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-
-        # Load Mimi audio codec (two instances: one for input encoding, one for output decoding)
+        device = torch.device(DEVICE_MAPS["personaplex"])
+        self.device = device
+        if PIN_MEMORY and device.type == "cuda":
+            self.pcm_host = torch.empty((1, 1, self.frame_size), dtype=torch.float32, pin_memory=True)
+            self.pcm_dev = torch.empty_like(self.pcm_host, device=device)
+            self.non_blocking = NON_BLOCKING_TRANSFER
+        if PERSONAPLEX_CUDA_STREAMS and device.type == "cuda":
+            self.encode_stream = torch.cuda.Stream(device)
+            self.lm_stream = torch.cuda.Stream(device)
+            self.decode_stream = torch.cuda.Stream(device)
+
+        # Load Mimi audio codec — one instance serves both directions: streaming state lives in
+        # the encoder-side and decoder-side submodules separately, so encode/decode don't interfere
         logger.info("Loading Mimi audio codec...")
         self.mimi = get_mimi(PERSONAPLEX_MODEL_NAME, device=device)
         self.mimi.eval()
-        self.mimi_out = get_mimi(PERSONAPLEX_MODEL_NAME, device=device)
-        self.mimi_out.eval()
 
         # Load the LM and wrap in LMGen for streaming inference
         logger.info("Loading PersonaPlex LM...")
         lm = get_moshi_lm(PERSONAPLEX_MODEL_NAME, device=device)
         lm.eval()
+        if PERSONAPLEX_QUANTIZATION != "none":
+            quantize_temporal_transformer(lm, PERSONAPLEX_QUANTIZATION)
 
         # Load voice prompt (.pt file) for voice conditioning
         voice_prompt_path = hf_hub_download(
@@ -95,8 +143,36 @@ class PersonaPlexModel:
             filename="tokenizer.model",
         )
         self.tokenizer = spm.SentencePieceProcessor(model_file=tokenizer_path)
+        # Decode every piece once (SentencePiece uses ▁ for word boundaries) so each frame's
+        # text token is a list lookup rather than two tokenizer calls and a str.replace.
+        # Special tokens (control pieces like BOS/EOS/PAD, unknown) decode to "" — the allowed-token mask.
+        word_boundary = str.maketrans("▁", " ")
+        self.piece_table = [
+            "" if self.tokenizer.is_control(i) or self.tokenizer.is_unknown(i)
+            else self.tokenizer.id_to_piece(i).translate(word_boundary)
+            for i in range(self.tokenizer.get_piece_size())
+        ]
+        self.piece_table[0] = ""  # id 0 is padding
+
+        if PERSONAPLEX_COMPILE_MODE:
+            compile_mode = PERSONAPLEX_COMPILE_MODE
+            if not (USE_CUDA_GRAPHS and device.type == "cuda") and compile_mode in ("reduce-overhead", "max-autotune"):
+                # Both modes capture CUDA graphs — keep the fused kernels, skip the graphs
+                compile_mode = "default" if compile_mode == "reduce-overhead" else "max-autotune-no-cudagraphs"
+            logger.info(f"Compiling PersonaPlex frame step (mode={compile_mode})")
+            self.lm_gen.step = torch.compile(self.lm_gen.step, mode=compile_mode, dynamic=False, fullgraph=False)
+            self.mimi.encode = torch.compile(self.mimi.encode, mode=compile_mode, dynamic=False, fullgraph=False)
+            self.mimi.decode = torch.compile(self.mimi.decode, mode=compile_mode, dynamic=False, fullgraph=False)
 
         self.loaded = True
+
+        if PERSONAPLEX_COMPILE_MODE:
+            # Pay compilation and graph capture now instead of on the first live frames
+            silence = np.zeros(self.frame_size, dtype=np.float32)
+            for _ in range(5):
+                self.encode_step_decode(silence)
+            self.reset()
+
         logger.info("PersonaPlex model loaded successfully")
 
     def encode_audio(self, pcm_float32: np.ndarray) -> torch.Tensor:
@@ -111,9 +187,18 @@ class PersonaPlexModel:
         if not self.loaded:
             raise RuntimeError("Model not loaded")
 
-        device = next(self.mimi.parameters()).device
         # Mimi expects (batch, channels, samples)
-        audio_tensor = torch.from_numpy(pcm_float32).float().unsqueeze(0).unsqueeze(0).to(device)
+        if self.pcm_dev is not None:
+            # Reuse the preallocated pinned/device pair — no per-frame allocation or pageable copy.
+            # The previous upload must be done reading pcm_host before it is overwritten.
+            if self.upload_done is not None:
+                self.upload_done.synchronize()
+            np.copyto(self.pcm_host.numpy()[0, 0], pcm_float32)
+            self.pcm_dev.copy_(self.pcm_host, non_blocking=self.non_blocking)
+            self.upload_done = torch.cuda.current_stream(self.device).record_event()
+            audio_tensor = self.pcm_dev
+        else:
+            audio_tensor = torch.from_numpy(pcm_float32).float().view(1, 1, -1).to(self.device)
 
         with torch.no_grad():
             codes = self.mimi.encode(audio_tensor)  # (1, 8, num_frames)
@@ -142,17 +227,19 @@ class PersonaPlexModel:
             text_token_id, audio_codes = out
             output_codes = audio_codes
 
-            # Decode text token
-            if text_token_id is not None:
-                token_id = text_token_id.item()
-                # Skip special tokens (padding, EOS, etc.)
-                if 0 < token_id < self.tokenizer.get_piece_size():
-                    text_token = self.tokenizer.id_to_piece(token_id)
-                    # SentencePiece uses ▁ for word boundaries
-                    text_token = text_token.replace("▁", " ")
+            text_token = self._decode_text_token(text_token_id)
 
         return output_codes, text_token
 
+    def _decode_text_token(self, text_token_id: torch.Tensor | None) -> str:
+        if text_token_id is None:
+            return ""
+        token_id = text_token_id.item()
+        # Skip special tokens (padding, EOS, etc.)
+        if 0 < token_id < len(self.piece_table):
+            return self.piece_table[token_id]
+        return ""
+
     def decode_audio(self, codes: torch.Tensor) -> np.ndarray:
         """Decode Mimi codes back to PCM audio.
 
@@ -166,12 +253,91 @@ class PersonaPlexModel:
             raise RuntimeError("Model not loaded")
 
         with torch.no_grad():
-            audio = self.mimi_out.decode(codes)  # (1, 1, samples)
+            audio = self.mimi.decode(codes)  # (1, 1, samples)
 
         return audio.squeeze().cpu().numpy()
 
+    def encode_step_decode(self, pcm_float32: np.ndarray) -> tuple[np.ndarray | None, str]:
+        """Run one full frame (encode → LM step → decode) in a single call.
+
+        Returns:
+            Tuple of (output PCM float32 audio or None, decoded_text_token)
+        """
+        output_codes, text_token = self.step(self.encode_audio(pcm_float32))
+        audio_out = self.decode_audio(output_codes) if output_codes is not None else None
+        return audio_out, text_token
+
+    def pipelined_step(self, pcm_float32: np.ndarray) -> tuple[np.ndarray | None, str]:
+        """encode_step_decode overlapped across frames on separate CUDA streams.
+
+        Queues frame N's Mimi encode and LM step plus the decode of frame N-1's output
+        codes, each on its own stream ordered by events, then collects frame N-1's audio
+        and text. Frame N's LM step is still running on the GPU while the caller sends
+        frame N-1 — at the cost of one frame (80ms) of extra output latency. Without
+        streams (PERSONAPLEX_CUDA_STREAMS off, or CPU) this is just encode_step_decode.
+        """
+        if self.lm_stream is None:
+            return self.encode_step_decode(pcm_float32)
+        if not self.loaded:
+            raise RuntimeError("Model not loaded")
+
+        # 1. Encode frame N
+        with torch.cuda.stream(self.encode_stream):
+            input_codes = self.encode_audio(pcm_float32)
+            encoded = self.encode_stream.record_event()
+
+        # 2. Decode frame N-1's output codes — overlaps with the encode above and LM step below
+        prev_out, prev_ready = self.pending or (None, None)
+        audio, decoded = None, None
+        if prev_out is not None and prev_out[1] is not None:
+            self.decode_stream.wait_event(prev_ready)
+            prev_out[1].record_stream(self.decode_stream)
+            with torch.no_grad(), torch.cuda.stream(self.decode_stream):
+                audio = self.mimi.decode(prev_out[1])  # (1, 1, samples)
+                decoded = self.decode_stream.record_event()
+
+        # 3. LM step on frame N, once its codes are ready
+        self.lm_stream.wait_event(encoded)
+        input_codes.record_stream(self.lm_stream)
+        with torch.no_grad(), torch.cuda.stream(self.lm_stream):
+            out = self.lm_gen.step(input_codes)
+            if out is not None:
+                # A compiled step (reduce-overhead) returns CUDA-graph output buffers that the
+                # next replay overwrites — frame N is read only after frame N+1's step is queued
+                out = tuple(t.clone() if t is not None else None for t in out)
+            self.pending = (out, self.lm_stream.record_event())
+
+        # 4. Collect frame N-1 (its LM step finished before its decode could start)
+        if prev_out is None:
+            return None, ""
+        prev_ready.synchronize()
+        text_token = self._decode_text_token(prev_out[0])
+        if audio is None:
+            return None, text_token
+        decoded.synchronize()
+        return audio.squeeze().cpu().numpy(), text_token
+
+    def flush(self) -> tuple[np.ndarray | None, str]:
+        """Collect the frame pipelined_step is still holding back (call on stop so it isn't lost).
+
+        Returns:
+            Tuple of (output PCM float32 audio or None, decoded_text_token)
+        """
+        prev_out, prev_ready = self.pending or (None, None)
+        self.pending = None
+        if prev_out is None:
+            return None, ""
+        prev_ready.synchronize()
+        text_token = self._decode_text_token(prev_out[0])
+        audio_out = self.decode_audio(prev_out[1]) if prev_out[1] is not None else None
+        return audio_out, text_token
+
     def reset(self):
         """Reset the LMGen streaming state for a new session."""
+        if self.lm_stream is not None:
+            # A pipelined step may still be running — don't reset the state under it
+            self.lm_stream.synchronize()
+        self.pending = None
         if self.lm_gen is not None:
             self.lm_gen.reset()
 
@@ -189,8 +355,11 @@ class PersonaPlexModel:
         """Free GPU memory."""
         self.lm_gen = None
         self.mimi = None
-        self.mimi_out = None
         self.tokenizer = None
+        self.piece_table = []
+        self.encode_stream = self.lm_stream = self.decode_stream = None
+        self.pending = None
+        self.pcm_host = self.pcm_dev = self.upload_done = None
         self.loaded = False
         if torch.cuda.is_available():
             torch.cuda.empty_cache()
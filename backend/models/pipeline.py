@@ -1,5 +1,7 @@
-import base64
+import copy
 import logging
+import re
+from collections.abc import Iterable, Iterator
 import numpy as np
 import torch
 from transformers import AutoModelForCausalLM, AutoTokenizer
@@ -7,17 +9,74 @@ from config import (
     ASR_MODEL_NAME,
     TRANSLATION_MODEL_NAME,
     TTS_MODEL_NAME,
-    DEVICE_MAP,
+    SPECULATIVE_DRAFT_MODEL,
+    GENERATION_KWARGS,
+    TORCH_COMPILE_MODE,
+    USE_CUDA_GRAPHS,
+    CACHE_IMPLEMENTATION,
+    MAX_CONTEXT_TOKENS,
+    MAX_NEW_TOKENS,
+    DEVICE_MAPS,
+    LOW_CPU_MEM_USAGE,
     TORCH_DTYPE,
+    ATTN_IMPLEMENTATION,
     IS_MAC,
     INPUT_SAMPLE_RATE,
     OUTPUT_SAMPLE_RATE,
-    VAD_THRESHOLD,
     VAD_SILENCE_DURATION_MS,
+    TTS_CPU_INT8,
+    build_quant_config,
 )
+from audio import AudioRing, float_to_pcm16, pcm16_b64_chunks
+from models.vad import load_vad, max_speech_prob, tail_is_silence
 
 logger = logging.getLogger(__name__)
 
+# Streaming sentence ends: Latin punctuation only once the following whitespace has arrived
+# (so "3." + "5" isn't split), CJK full-width punctuation immediately
+SENTENCE_END_RE = re.compile(r'[.!?](?=\s)|[。！？]')
+SENTENCE_END_CHARS = frozenset(".!?。！？")
+ABBREVIATION_RE = re.compile(r'(?:^|[\s.])(?:Dr|Mr|Mrs|Ms|Mme|Mlle|Prof|St|Jr|Sr|Sra|vs|etc|Inc|Ltd|No|[A-Za-z])$')
+MIN_STREAM_SENTENCE_CHARS = 10
+
+
+def sentence_stream(text_stream: Iterable[str]) -> Iterator[str]:
+    """Regroup streamed text chunks into sentences, yielded as soon as each one ends.
+
+    Boundaries after abbreviations/initials ("Dr.", "U.S.") are skipped and sentences
+    shorter than MIN_STREAM_SENTENCE_CHARS are held for the next one; the remainder is
+    flushed when the stream ends. Yielded pieces keep their whitespace, so joining them
+    reproduces the streamed text exactly.
+    """
+    buffer = ""
+    scan_from = 0
+    for chunk in text_stream:
+        buffer += chunk
+        if SENTENCE_END_CHARS.isdisjoint(buffer[scan_from:]):
+            scan_from = max(len(buffer) - 1, 0)
+            continue  # most chunks are mid-sentence — skip the regex scan entirely
+        cut = 0
+        for m in SENTENCE_END_RE.finditer(buffer, scan_from):
+            end = m.end()
+            if len(buffer[cut:end].strip()) < MIN_STREAM_SENTENCE_CHARS:
+                continue
+            if ABBREVIATION_RE.search(buffer[max(cut, m.start() - 8):m.start()]):
+                continue
+            yield buffer[cut:end]
+            cut = end
+        buffer = buffer[cut:]
+        scan_from = max(len(buffer) - 1, 0)  # a trailing "." is only decidable once more text arrives
+    if buffer:
+        yield buffer
+
+
+def split_sentences(text: str) -> list[str]:
+    """Split complete text at sentence ends with the same rules as sentence_stream.
+
+    Text that sentence_stream already yielded as one sentence comes back unsplit.
+    """
+    return [sentence.strip() for sentence in sentence_stream([text.strip()]) if sentence.strip()]
+
 
 class ASRModel:
     def __init__(self):
@@ -28,7 +87,8 @@ class ASRModel:
         logger.info(f"Loading ASR model: {ASR_MODEL_NAME}")
         from qwen_asr import Qwen3ASRModel
 
-        self.model = Qwen3ASRModel.from_pretrained(ASR_MODEL_NAME)
+        kwargs = {"device_map": DEVICE_MAPS["asr"]} if DEVICE_MAPS["asr"] else {}
+        self.model = Qwen3ASRModel.from_pretrained(ASR_MODEL_NAME, **kwargs)
         self.loaded = True
         logger.info("ASR model loaded successfully")
 
@@ -66,56 +126,123 @@ class ASRModel:
         return str(result)
 
 
+def translation_system_prompt(target_language: str) -> str:
+    return f"You are a translator. Translate the following text to {target_language}. Output ONLY the translation, nothing else."
+
+
 class TranslationModel:
     def __init__(self):
         self.model = None
+        self.draft_model = None  # optional assistant model for speculative decoding
         self.tokenizer = None
+        self.generation_config = None  # greedy decoding settings, built once in load()
+        self.prompt_cache: dict[str, tuple[list[int], list[int]]] = {}  # target_language -> (prefix_ids, suffix_ids)
         self.loaded = False
 
     def load(self):
         logger.info(f"Loading translation model: {TRANSLATION_MODEL_NAME}")
         self.tokenizer = AutoTokenizer.from_pretrained(TRANSLATION_MODEL_NAME)
-        dtype = torch.float16 if TORCH_DTYPE == "float16" else torch.bfloat16
         self.model = AutoModelForCausalLM.from_pretrained(
             TRANSLATION_MODEL_NAME,
-            torch_dtype=dtype,
-            device_map=DEVICE_MAP,
+            torch_dtype=TORCH_DTYPE,
+            device_map=DEVICE_MAPS["translation"],
+            low_cpu_mem_usage=LOW_CPU_MEM_USAGE,
+            attn_implementation=ATTN_IMPLEMENTATION,
+            quantization_config=build_quant_config(),
         )
         self.model.eval()
+
+        if SPECULATIVE_DRAFT_MODEL:
+            logger.info(f"Loading speculative draft model: {SPECULATIVE_DRAFT_MODEL}")
+            self.draft_model = AutoModelForCausalLM.from_pretrained(
+                SPECULATIVE_DRAFT_MODEL,
+                torch_dtype=TORCH_DTYPE,
+                device_map=DEVICE_MAPS["translation"],
+                low_cpu_mem_usage=LOW_CPU_MEM_USAGE,
+                attn_implementation=ATTN_IMPLEMENTATION,
+            )
+            self.draft_model.eval()
+
+        if TORCH_COMPILE_MODE:
+            compile_mode = TORCH_COMPILE_MODE
+            if not USE_CUDA_GRAPHS and compile_mode in ("reduce-overhead", "max-autotune"):
+                # Both modes capture CUDA graphs — keep the fused kernels, skip the graphs
+                compile_mode = "default" if compile_mode == "reduce-overhead" else "max-autotune-no-cudagraphs"
+            logger.info(f"Compiling translation model forward (mode={compile_mode})")
+            if self.draft_model is None:
+                # Static KV cache keeps decode-step shapes fixed so Inductor can CUDA-graph them
+                # (assisted generation needs a dynamic cache, so leave it alone with a draft model)
+                self.model.generation_config.cache_implementation = CACHE_IMPLEMENTATION
+            self.model.forward = torch.compile(
+                self.model.forward, mode=compile_mode, dynamic=False, fullgraph=False
+            )
+
+        # Model defaults (eos ids, cache_implementation) + our greedy settings, resolved once instead of
+        # merging kwargs into a fresh config on every generate() call; sampling knobs cleared so greedy
+        # decoding doesn't re-validate (and warn about) them each time
+        self.generation_config = copy.deepcopy(self.model.generation_config)
+        self.generation_config.update(
+            **GENERATION_KWARGS,
+            max_new_tokens=MAX_NEW_TOKENS,
+            pad_token_id=self.tokenizer.eos_token_id,
+            temperature=None,
+            top_p=None,
+            top_k=None,
+        )
+
         self.loaded = True
+
+        if TORCH_COMPILE_MODE:
+            # Pay compilation and graph capture now instead of on the first live request
+            self.translate("Hello.", "French")
+
         logger.info("Translation model loaded successfully")
 
     def unload(self):
         self.model = None
+        self.draft_model = None
         self.tokenizer = None
+        self.generation_config = None
+        self.prompt_cache.clear()
         self.loaded = False
         if torch.cuda.is_available():
             torch.cuda.empty_cache()
         logger.info("Translation model unloaded")
 
+    def _prompt_inputs(self, text: str, target_language: str) -> dict:
+        """Tokenized context-free prompt, from a per-language cache of the chat-template token ids.
+
+        Only the user text is tokenized per call; the rendered system prompt and role
+        wrappers around it are tokenized once per target language.
+        """
+        if target_language not in self.prompt_cache:
+            placeholder = "\x00"
+            messages = [
+                {"role": "system", "content": translation_system_prompt(target_language)},
+                {"role": "user", "content": placeholder},
+            ]
+            template = self.tokenizer.apply_chat_template(messages, tokenize=False, add_generation_prompt=True)
+            prefix, suffix = template.split(placeholder)
+            self.prompt_cache[target_language] = (
+                self.tokenizer.encode(prefix, add_special_tokens=False),
+                self.tokenizer.encode(suffix, add_special_tokens=False),
+            )
+        prefix_ids, suffix_ids = self.prompt_cache[target_language]
+        input_ids = torch.tensor([prefix_ids + self.tokenizer.encode(text, add_special_tokens=False) + suffix_ids])
+        return {"input_ids": input_ids, "attention_mask": torch.ones_like(input_ids)}
+
     def translate(self, text: str, target_language: str) -> str:
         """Translate text to target language."""
         if not self.loaded:
             raise RuntimeError("Translation model not loaded")
 
-        messages = [
-            {
-                "role": "system",
-                "content": f"You are a translator. Translate the following text to {target_language}. Output ONLY the translation, nothing else.",
-            },
-            {"role": "user", "content": text},
-        ]
+        inputs = {k: v.to(self.model.device) for k, v in self._prompt_inputs(text, target_language).items()}
 
-        input_text = self.tokenizer.apply_chat_template(
-            messages, tokenize=False, add_generation_prompt=True
-        )
-        inputs = self.tokenizer(input_text, return_tensors="pt").to(self.model.device)
-
-        with torch.no_grad():
+        with torch.inference_mode():
             outputs = self.model.generate(
                 **inputs,
-                max_new_tokens=512,
-                do_sample=False,
+                generation_config=self.generation_config,
+                assistant_model=self.draft_model,
             )
 
         # Decode only the generated tokens (skip the prompt)
@@ -131,21 +258,33 @@ class TranslationModel:
         if not self.loaded:
             raise RuntimeError("Translation model not loaded")
 
-        system_prompt = f"You are a translator. Translate the following text to {target_language}. Output ONLY the translation, nothing else."
+        system_prompt = translation_system_prompt(target_language)
+        context_turns = list(context_turns or [])
+
+        while True:
+            if not context_turns:
+                inputs = self._prompt_inputs(text, target_language)
+                break
 
-        messages = [{"role": "system", "content": system_prompt}]
+            messages = [{"role": "system", "content": system_prompt}]
 
-        # Add prior translation turns as chat history
-        if context_turns:
+            # Add prior translation turns as chat history
             messages.extend(context_turns)
 
-        # Add the new text to translate
-        messages.append({"role": "user", "content": text})
+            # Add the new text to translate
+            messages.append({"role": "user", "content": text})
 
-        input_text = self.tokenizer.apply_chat_template(
-            messages, tokenize=False, add_generation_prompt=True
-        )
-        inputs = self.tokenizer(input_text, return_tensors="pt").to(self.model.device)
+            input_text = self.tokenizer.apply_chat_template(
+                messages, tokenize=False, add_generation_prompt=True
+            )
+            inputs = self.tokenizer(input_text, return_tensors="pt")
+
+            # Keep the prompt within MAX_CONTEXT_TOKENS by dropping the oldest user/assistant pair
+            if inputs["input_ids"].shape[1] <= MAX_CONTEXT_TOKENS:
+                break
+            context_turns = context_turns[2:]
+
+        inputs = {k: v.to(self.model.device) for k, v in inputs.items()}
 
         from transformers import TextIteratorStreamer
         from threading import Thread
@@ -154,12 +293,17 @@ class TranslationModel:
 
         generation_kwargs = {
             **inputs,
-            "max_new_tokens": 512,
-            "do_sample": False,
+            "generation_config": self.generation_config,
+            "assistant_model": self.draft_model,
             "streamer": streamer,
         }
 
-        thread = Thread(target=self.model.generate, kwargs=generation_kwargs)
+        def run_generate():
+            # Grad mode is thread-local, so the inference-mode guard must be entered in the worker thread
+            with torch.inference_mode():
+                self.model.generate(**generation_kwargs)
+
+        thread = Thread(target=run_generate)
         thread.start()
 
         for text_chunk in streamer:
@@ -179,15 +323,27 @@ class TTSModel:
         logger.info(f"Loading TTS model: {TTS_MODEL_NAME}")
         from qwen_tts import Qwen3TTSModel
 
-        # Force CPU on Mac — MPS doesn't support >65536 output channels needed by TTS
-        tts_device = "cpu" if IS_MAC else DEVICE_MAP
-        dtype = torch.float32 if IS_MAC else (torch.float16 if TORCH_DTYPE == "float16" else torch.bfloat16)
+        tts_device = DEVICE_MAPS["tts"]
+        dtype = torch.float32 if IS_MAC else TORCH_DTYPE
         self.model = Qwen3TTSModel.from_pretrained(
             TTS_MODEL_NAME,
             device_map=tts_device,
             dtype=dtype,
         )
+        if TTS_CPU_INT8 and tts_device == "cpu":
+            # fp32 CPU synthesis is matmul-bound — int8 weights with dynamically quantized
+            # activations on every Linear. quantize_dynamic swaps the layers in place, so the
+            # qwen_tts wrapper keeps driving the same module (generate()'s control flow rules out TorchScript).
+            inner = getattr(self.model, "model", None)
+            module = inner if isinstance(inner, torch.nn.Module) else self.model
+            logger.info("Applying dynamic int8 quantization to CPU TTS")
+            torch.ao.quantization.quantize_dynamic(module, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
         self.loaded = True
+
+        if TTS_CPU_INT8 and tts_device == "cpu":
+            # First quantized call pays for kernel/packing setup — do it now, not on a live request
+            self._synthesize_pcm16("Hello.", "English")
+
         logger.info("TTS model loaded successfully")
 
     def unload(self):
@@ -197,8 +353,23 @@ class TTSModel:
             torch.cuda.empty_cache()
         logger.info("TTS model unloaded")
 
-    def synthesize(self, text: str, language: str = "Auto") -> str:
-        """Synthesize speech from text. Returns base64-encoded PCM int16 audio."""
+    def synthesize_chunks(self, text: str, language: str = "Auto") -> list[str]:
+        """Synthesize speech and split it into TTS_STREAM_CHUNK_MS pieces of base64 PCM int16."""
+        return pcm16_b64_chunks(self._synthesize_pcm16(text, language), self.sample_rate)
+
+    def synthesize_stream(self, text: str, language: str = "Auto") -> Iterator[tuple[str, bool]]:
+        """Synthesize sentence by sentence, yielding (base64 PCM int16 chunk, is_last).
+
+        qwen_tts has no incremental decoding API, so each sentence is synthesized whole —
+        the first audio is ready after the first sentence instead of after the full text.
+        """
+        sentences = split_sentences(text)
+        for i, sentence in enumerate(sentences):
+            chunks = self.synthesize_chunks(sentence, language)
+            for j, chunk in enumerate(chunks):
+                yield chunk, (i == len(sentences) - 1 and j == len(chunks) - 1)
+
+    def _synthesize_pcm16(self, text: str, language: str) -> np.ndarray:
         if not self.loaded:
             raise RuntimeError("TTS model not loaded")
 
@@ -218,9 +389,7 @@ class TTSModel:
         if audio_np.ndim > 1:
             audio_np = audio_np.squeeze()
 
-        # Convert to int16 PCM
-        audio_int16 = np.clip(audio_np * 32767, -32768, 32767).astype(np.int16)
-        return base64.b64encode(audio_int16.tobytes()).decode("ascii")
+        return float_to_pcm16(audio_np)
 
 
 class VADDetector:
@@ -231,12 +400,8 @@ class VADDetector:
         self.loaded = False
 
     def load(self):
-        logger.info("Loading silero VAD for pipeline")
-        self.model, vad_utils = torch.hub.load(
-            repo_or_dir="snakers4/silero-vad",
-            model="silero_vad",
-            trust_repo=True,
-        )
+        logger.info("Loading VAD for pipeline")
+        self.model, vad_utils = load_vad()
         self.loaded = True
         logger.info("VAD loaded successfully")
 
@@ -247,29 +412,15 @@ class VADDetector:
             torch.cuda.empty_cache()
         logger.info("VAD unloaded")
 
-    def detect_speech_end(self, audio_np: np.ndarray, sample_rate: int) -> bool:
-        """Check if the tail of the audio buffer is silence.
-        Silero VAD requires exactly 512 samples per call at 16kHz."""
-        # Need at least a few windows to check
-        window_size = 512 if sample_rate == 16000 else 256
-        num_tail_windows = int(VAD_SILENCE_DURATION_MS / 1000 * sample_rate / window_size)
-        num_tail_windows = max(num_tail_windows, 2)
-
-        if len(audio_np) < window_size * num_tail_windows:
-            return False
-
-        # Check the last N windows — if all are below threshold, speech has ended
-        tail_start = len(audio_np) - (window_size * num_tail_windows)
-        for i in range(num_tail_windows):
-            chunk = audio_np[tail_start + i * window_size : tail_start + (i + 1) * window_size]
-            audio_tensor = torch.from_numpy(chunk).float()
-            if audio_tensor.abs().max() > 0:
-                audio_tensor = audio_tensor / audio_tensor.abs().max()
-            speech_prob = self.model(audio_tensor, sample_rate).item()
-            if speech_prob >= VAD_THRESHOLD:
-                return False  # Still speaking in at least one window
-
-        return True  # All tail windows are silence
+    def detect_speech_end(
+        self, audio: np.ndarray | AudioRing, sample_rate: int, silence_ms: int = VAD_SILENCE_DURATION_MS
+    ) -> bool:
+        """Check if the last silence_ms of the audio buffer is silence."""
+        return tail_is_silence(self.model, audio, sample_rate, silence_ms)
+
+    def speech_prob(self, audio_np: np.ndarray, sample_rate: int) -> float:
+        """Peak VAD speech probability over a freshly received chunk (early-exit gating)."""
+        return max_speech_prob(self.model, audio_np, sample_rate)
 
 
 # Singleton instances
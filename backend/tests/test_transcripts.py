@@ -0,0 +1,43 @@
+from transcripts import splice_transcripts
+
+
+def splice(prev: str, tail: str, expected_start: int = 0) -> str | None:
+    spliced = splice_transcripts(prev.split(), tail.split(), expected_start)
+    return None if spliced is None else " ".join(spliced)
+
+
+def test_splices_on_overlap():
+    assert splice("so we met at the station yesterday", "at the station yesterday and then left", 3) == (
+        "so we met at the station yesterday and then left"
+    )
+
+
+def test_skips_cut_off_first_tail_word():
+    assert splice("please send me the report today", "ort the report today before noon", 2) == (
+        "please send me the report today before noon"
+    )
+
+
+def test_repeated_phrase_is_not_duplicated():
+    assert splice(
+        "I went to the bank and then I went to the",
+        "to the bank and then I went to the store",
+        2,
+    ) == "I went to the bank and then I went to the store"
+
+
+def test_repeated_phrase_with_data():
+    assert splice(
+        "look at the data and then look at the",
+        "at the data and then look at the chart",
+        1,
+    ) == "look at the data and then look at the chart"
+
+
+def test_ambiguous_anchor_falls_back():
+    # "look at the" occurs twice after the expected start — let the caller re-transcribe
+    assert splice("first look at the data then look at the chart", "look at the chart again", 0) is None
+
+
+def test_no_anchor_falls_back():
+    assert splice("completely different words here", "nothing in common at all") is None
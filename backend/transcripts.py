@@ -0,0 +1,33 @@
+SPLICE_ANCHOR_WORDS = 3  # words an anchor must match — a bigram like "to the" repeats too often
+SPLICE_SEARCH_WORDS = 3  # tail words searched for an anchor (the first may be a cut-off fragment)
+SPLICE_SLACK_WORDS = 2  # how far before the expected overlap start an anchor may sit
+
+
+def _norm_word(word: str) -> str:
+    return word.strip(".,!?;:\"'").lower()
+
+
+def splice_transcripts(prev_words: list[str], tail_words: list[str], expected_start: int = 0) -> list[str] | None:
+    """Splice a re-transcribed tail window onto the previous full transcript.
+
+    expected_start is the estimated index in prev_words where the tail window begins.
+    Anchors on the earliest SPLICE_ANCHOR_WORDS-word run of prev_words at or after it
+    (less SPLICE_SLACK_WORDS) that also starts one of the first SPLICE_SEARCH_WORDS tail
+    words. Returns None when there's no anchor, or when the run occurs more than once
+    there (a repeated phrase, e.g. "I went to the ... I went to the"), so the caller can
+    fall back to transcribing the whole buffer.
+    """
+    prev_n = [_norm_word(w) for w in prev_words]
+    tail_n = [_norm_word(w) for w in tail_words]
+    lo = max(0, expected_start - SPLICE_SLACK_WORDS)
+    for j in range(min(SPLICE_SEARCH_WORDS, len(tail_n) - SPLICE_ANCHOR_WORDS + 1)):
+        anchor = tail_n[j:j + SPLICE_ANCHOR_WORDS]
+        matches = [
+            i for i in range(lo, len(prev_n) - SPLICE_ANCHOR_WORDS + 1)
+            if prev_n[i:i + SPLICE_ANCHOR_WORDS] == anchor
+        ]
+        if len(matches) == 1:
+            return prev_words[:matches[0]] + tail_words[j:]
+        if matches:
+            return None  # ambiguous anchor
+    return None
@@ -33,20 +33,15 @@ export const useLocalOmni = (): UseLocalOmniReturn => {
   const playbackContextRef = useRef<AudioContext | null>(null);
   const nextPlayTimeRef = useRef(0);
 
-  // Helper to convert Float32 audio to PCM Int16 Base64
-  const pcmToBase64 = (data: Float32Array): string => {
+  // Helper to convert Float32 audio to raw PCM Int16 (sent as a binary WebSocket frame)
+  const floatToPcm16 = (data: Float32Array): ArrayBuffer => {
     const l = data.length;
     const int16 = new Int16Array(l);
     for (let i = 0; i < l; i++) {
       const s = Math.max(-1, Math.min(1, data[i]));
       int16[i] = s < 0 ? s * 0x8000 : s * 0x7FFF;
     }
-    let binary = '';
-    const bytes = new Uint8Array(int16.buffer);
-    for (let i = 0; i < bytes.byteLength; i++) {
-      binary += String.fromCharCode(bytes[i]);
-    }
-    return btoa(binary);
+    return int16.buffer;
   };
 
   // Play audio chunk with scheduled buffering (same pattern as useGeminiLive)
@@ -151,10 +146,15 @@ export const useLocalOmni = (): UseLocalOmniReturn => {
 
         // Send config
         ws.send(JSON.stringify({ type: 'config', targetLanguage: targetLang }));
+      };
 
-        // Start audio capture
+      // Start audio capture once the server has told us its chunk size (audio_config)
+      let captureStarted = false;
+      const startCapture = (chunkSize: number) => {
+        if (captureStarted) return;
+        captureStarted = true;
         const source = audioCtx.createMediaStreamSource(stream);
-        const processor = audioCtx.createScriptProcessor(4096, 1, 1);
+        const processor = audioCtx.createScriptProcessor(chunkSize, 1, 1);
 
         processor.onaudioprocess = (e) => {
           const inputData = e.inputBuffer.getChannelData(0);
@@ -162,9 +162,9 @@ export const useLocalOmni = (): UseLocalOmniReturn => {
           for (let i = 0; i < inputData.length; i++) sum += inputData[i] * inputData[i];
           setVolume(Math.min(1, Math.sqrt(sum / inputData.length) * 15));
 
-          const base64Data = pcmToBase64(inputData);
+          const pcm = floatToPcm16(inputData);
           if (ws.readyState === WebSocket.OPEN) {
-            ws.send(JSON.stringify({ type: 'audio', data: base64Data, sampleRate: 16000 }));
+            ws.send(pcm);
           }
         };
 
@@ -178,6 +178,9 @@ export const useLocalOmni = (): UseLocalOmniReturn => {
         const msg = JSON.parse(event.data);
 
         switch (msg.type) {
+          case 'audio_config':
+            startCapture(msg.chunkSize || 4096);
+            break;
           case 'source_text':
             setSourceTranscript(prev => prev + msg.data + ' ');
             break;
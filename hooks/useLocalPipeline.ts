@@ -42,20 +42,15 @@ export const useLocalPipeline = (): UseLocalPipelineReturn => {
   const nextPlayTimeRef = useRef(0);
   const activeSourceCountRef = useRef(0);
 
-  // Helper to convert Float32 audio to PCM Int16 Base64
-  const pcmToBase64 = (data: Float32Array): string => {
+  // Helper to convert Float32 audio to raw PCM Int16 (sent as a binary WebSocket frame)
+  const floatToPcm16 = (data: Float32Array): ArrayBuffer => {
     const l = data.length;
     const int16 = new Int16Array(l);
     for (let i = 0; i < l; i++) {
       const s = Math.max(-1, Math.min(1, data[i]));
       int16[i] = s < 0 ? s * 0x8000 : s * 0x7FFF;
     }
-    let binary = '';
-    const bytes = new Uint8Array(int16.buffer);
-    for (let i = 0; i < bytes.byteLength; i++) {
-      binary += String.fromCharCode(bytes[i]);
-    }
-    return btoa(binary);
+    return int16.buffer;
   };
 
   // Play audio chunk and track speaking state
@@ -247,45 +242,45 @@ export const useLocalPipeline = (): UseLocalPipelineReturn => {
           if (asrMode === 'browser') {
             startBrowserRecognition();
           }
+        };
 
-          // Local ASR mode: start audio capture
-          if (asrMode === 'local') {
-            const startAudioCapture = async () => {
-              try {
-                const AudioContextClass = (window as any).AudioContext || (window as any).webkitAudioContext;
-                const audioCtx = new AudioContextClass({ sampleRate: 16000 });
-                audioContextRef.current = audioCtx;
-
-                const stream = await navigator.mediaDevices.getUserMedia({ audio: true });
-                mediaStreamRef.current = stream;
-
-                const source = audioCtx.createMediaStreamSource(stream);
-                const processor = audioCtx.createScriptProcessor(4096, 1, 1);
-
-                processor.onaudioprocess = (e) => {
-                  const inputData = e.inputBuffer.getChannelData(0);
-
-                  // Compute volume for visual feedback
-                  let sum = 0;
-                  for (let i = 0; i < inputData.length; i++) sum += inputData[i] * inputData[i];
-                  setVolume(Math.min(1, Math.sqrt(sum / inputData.length) * 15));
-
-                  const base64Data = pcmToBase64(inputData);
-                  if (ws.readyState === WebSocket.OPEN) {
-                    ws.send(JSON.stringify({ type: 'audio', data: base64Data, sampleRate: 16000 }));
-                  }
-                };
-
-                source.connect(processor);
-                processor.connect(audioCtx.destination);
-                sourceRef.current = source;
-                processorRef.current = processor;
-              } catch (err: any) {
-                console.error('[LocalPipeline] Audio capture failed:', err);
-                setError(err.message || 'Microphone access failed');
+        // Local ASR mode: start audio capture once the server has sent its chunk size (audio_config)
+        let captureStarted = false;
+        const startAudioCapture = async (chunkSize: number) => {
+          if (asrMode !== 'local' || captureStarted) return;
+          captureStarted = true;
+          try {
+            const AudioContextClass = (window as any).AudioContext || (window as any).webkitAudioContext;
+            const audioCtx = new AudioContextClass({ sampleRate: 16000 });
+            audioContextRef.current = audioCtx;
+
+            const stream = await navigator.mediaDevices.getUserMedia({ audio: true });
+            mediaStreamRef.current = stream;
+
+            const source = audioCtx.createMediaStreamSource(stream);
+            const processor = audioCtx.createScriptProcessor(chunkSize, 1, 1);
+
+            processor.onaudioprocess = (e) => {
+              const inputData = e.inputBuffer.getChannelData(0);
+
+              // Compute volume for visual feedback
+              let sum = 0;
+              for (let i = 0; i < inputData.length; i++) sum += inputData[i] * inputData[i];
+              setVolume(Math.min(1, Math.sqrt(sum / inputData.length) * 15));
+
+              const pcm = floatToPcm16(inputData);
+              if (ws.readyState === WebSocket.OPEN) {
+                ws.send(pcm);
               }
             };
-            startAudioCapture();
+
+            source.connect(processor);
+            processor.connect(audioCtx.destination);
+            sourceRef.current = source;
+            processorRef.current = processor;
+          } catch (err: any) {
+            console.error('[LocalPipeline] Audio capture failed:', err);
+            setError(err.message || 'Microphone access failed');
           }
         };
 
@@ -294,6 +289,9 @@ export const useLocalPipeline = (): UseLocalPipelineReturn => {
           console.log('[LocalPipeline] Received:', msg.type, msg.type === 'audio' ? '(audio data)' : msg.data);
 
           switch (msg.type) {
+            case 'audio_config':
+              startAudioCapture(msg.chunkSize || 4096);
+              break;
             case 'source_text_interim':
               // Only update source text from server in local ASR mode
               // In browser mode, source text is set directly by feedTranscript
@@ -36,24 +36,19 @@ export const usePersonaPlex = (): UsePersonaPlexReturn => {
   // PersonaPlex native sample rate
   const SAMPLE_RATE = 24000;
 
-  // Helper to convert Float32 audio to PCM Int16 Base64
-  const pcmToBase64 = (data: Float32Array): string => {
+  // Helper to convert Float32 audio to raw PCM Int16 (sent as a binary WebSocket frame)
+  const floatToPcm16 = (data: Float32Array): ArrayBuffer => {
     const l = data.length;
     const int16 = new Int16Array(l);
     for (let i = 0; i < l; i++) {
       const s = Math.max(-1, Math.min(1, data[i]));
       int16[i] = s < 0 ? s * 0x8000 : s * 0x7FFF;
     }
-    let binary = '';
-    const bytes = new Uint8Array(int16.buffer);
-    for (let i = 0; i < bytes.byteLength; i++) {
-      binary += String.fromCharCode(bytes[i]);
-    }
-    return btoa(binary);
+    return int16.buffer;
   };
 
   // Play audio chunk with scheduled buffering (same pattern as useGeminiLive/useLocalOmni)
-  const playAudioChunk = useCallback(async (base64Data: string, sampleRate: number = 24000) => {
+  const playAudioChunk = useCallback(async (pcmData: ArrayBuffer, sampleRate: number = 24000) => {
     if (!playbackContextRef.current) {
       const AudioContextClass = (window as any).AudioContext || (window as any).webkitAudioContext;
       playbackContextRef.current = new AudioContextClass({ sampleRate });
@@ -64,13 +59,8 @@ export const usePersonaPlex = (): UsePersonaPlexReturn => {
       await ctx.resume();
     }
 
-    // Decode base64 to Int16 PCM
-    const binaryString = atob(base64Data);
-    const bytes = new Uint8Array(binaryString.length);
-    for (let i = 0; i < binaryString.length; i++) {
-      bytes[i] = binaryString.charCodeAt(i);
-    }
-    const int16 = new Int16Array(bytes.buffer);
+    // Raw Int16 PCM from a binary WebSocket frame
+    const int16 = new Int16Array(pcmData);
 
     // Convert Int16 to Float32
     const float32 = new Float32Array(int16.length);
@@ -147,6 +137,7 @@ export const usePersonaPlex = (): UsePersonaPlexReturn => {
       const targetLang = options?.targetLanguage || 'French';
 
       const ws = new WebSocket(`${backendUrl}/ws/personaplex`);
+      ws.binaryType = 'arraybuffer';
       wsRef.current = ws;
 
       ws.onopen = () => {
@@ -166,9 +157,9 @@ export const usePersonaPlex = (): UsePersonaPlexReturn => {
           for (let i = 0; i < inputData.length; i++) sum += inputData[i] * inputData[i];
           setVolume(Math.min(1, Math.sqrt(sum / inputData.length) * 15));
 
-          const base64Data = pcmToBase64(inputData);
+          const pcm = floatToPcm16(inputData);
           if (ws.readyState === WebSocket.OPEN) {
-            ws.send(JSON.stringify({ type: 'audio', data: base64Data, sampleRate: SAMPLE_RATE }));
+            ws.send(pcm);
           }
         };
 
@@ -179,15 +170,17 @@ export const usePersonaPlex = (): UsePersonaPlexReturn => {
       };
 
       ws.onmessage = (event) => {
+        // Binary frames are output audio (Int16 PCM at SAMPLE_RATE), text frames are JSON
+        if (event.data instanceof ArrayBuffer) {
+          playAudioChunk(event.data, SAMPLE_RATE);
+          return;
+        }
         const msg = JSON.parse(event.data);
 
         switch (msg.type) {
           case 'translated_text':
             setTranscript(prev => prev + msg.data);
             break;
-          case 'audio':
-            playAudioChunk(msg.data, msg.sampleRate || SAMPLE_RATE);
-            break;
           case 'error':
             setError(msg.message);
             break;